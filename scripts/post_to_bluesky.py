@@ -1,31 +1,63 @@
 #!/usr/bin/env python3
 import os
 import re
+import sys
 import time
 import json
 import random
 import logging
 import argparse
+import bisect
 import difflib
+import hashlib
 import requests
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from heapq import nlargest
+from itertools import accumulate
 from datetime import datetime, timezone, timedelta
+from urllib.parse import quote, urlparse
 # Updated to work with atproto 0.0.61
 from atproto import Client as AtprotoClient
 from pathlib import Path
 
+# Define the script, project, logs and tweets directories
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+LOGS_DIR = PROJECT_ROOT / 'logs'
+TWEETS_DIR = PROJECT_ROOT / 'tweets'
+
+# rapidfuzz is optional; fall back to difflib when it is not installed
+try:
+    from rapidfuzz import fuzz
+except ImportError:
+    fuzz = None
+
+# orjson is optional; fall back to the json module when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# numpy is optional; uniqueness ranking falls back to difflib without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Try to load environment variables from .env file for local development
 try:
     from dotenv import load_dotenv
-    from pathlib import Path
     
     # First try the .env file in the project root
-    env_path = Path(__file__).resolve().parent.parent / '.env'
+    env_path = PROJECT_ROOT / '.env'
     if env_path.exists():
         load_dotenv(dotenv_path=env_path)
         print(f"Loaded environment variables from: {env_path}")
     else:
         # Fall back to .env file in the scripts directory
-        env_path = Path(__file__).resolve().parent / '.env'
+        env_path = SCRIPT_DIR / '.env'
         if env_path.exists():
             load_dotenv(dotenv_path=env_path)
             print(f"Loaded environment variables from: {env_path}")
@@ -34,20 +66,20 @@ try:
 except ImportError:
     print("dotenv not installed, using system environment variables")
 
+# Ensure logs directory exists before the log file is opened
+LOGS_DIR.mkdir(exist_ok=True)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler(os.path.join(os.path.dirname(__file__), '../logs/bluesky_posting.log')),
+        logging.FileHandler(LOGS_DIR / 'bluesky_posting.log'),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger('bluesky_posting')
 
-# Ensure logs directory exists
-Path(os.path.join(os.path.dirname(__file__), '../logs')).mkdir(exist_ok=True)
-
 # Try to get Bluesky credentials from config, then environment, with no hardcoded fallback
 try:
     from config_loader import ConfigLoader
@@ -77,16 +109,169 @@ except Exception as e:
     BLUESKY_USERNAME = os.environ.get('BLUESKY_USERNAME', "")
     BLUESKY_PASSWORD = os.environ.get('BLUESKY_PASSWORD', "")
 
-# Define the tweets directory
-TWEETS_DIR = os.path.join(os.path.dirname(__file__), '../tweets')
-
 # Define URL shortening configuration
 # This is a global variable that will be modified by command line arguments
 USE_URL_SHORTENER = True
 
+# Pretty-print post records in debug logs instead of logging compact JSON
+# This is a global variable that will be modified by command line arguments
+PRETTY_LOG_RECORD = False
+
 # Hard-code the platform for this script
 PLATFORM = "bluesky"
 
+# Patterns used to find URLs, hashtags and words in tweet text
+_URL_RE = re.compile(r'https?://\S+')
+_HASHTAG_RE = re.compile(r'#\w+')
+_WORD_RE = re.compile(r'\w\w+')
+_TIME_RE = re.compile(r'\[\d{2}:\d{2}:\d{2}\]')
+
+# Enforce Bluesky character limit (300 graphemes)
+# We'll use a much lower limit to be safe (250 characters)
+# This is because the character count in Python is different from grapheme count in Bluesky
+BLUESKY_CHAR_LIMIT = 250
+
+# URLs up to this length are not worth shortening on their own
+SHORT_URL_LENGTH = 30
+
+# DID of the logged-in Bluesky account, looked up after the first login
+_repo_did = None
+
+# Header written at the top of a new posted tweets archive
+ARCHIVE_HEADER = (
+    b"# Archive of all posted tweets for similarity detection\n"
+    b"# Format: [timestamp] tweet text\n"
+    b"# Separator: ---\n\n"
+)
+
+# Duplicate check verdicts from the last run, reused while the recent tweets are unchanged
+DUPLICATE_CHECK_CACHE_FILE = TWEETS_DIR / f"{PLATFORM}_duplicate_check_cache.json"
+
+def load_json_file(path):
+    """
+    Loads a JSON file such as a posted tweet history file.
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_json_file(path, data):
+    """
+    Saves data to a JSON file in compact form.
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+
+@lru_cache(maxsize=4096)
+def normalize_text(text):
+    """
+    Normalizes a tweet for similarity comparison:
+    lowercase, without URLs, hashtags and added timestamps.
+    
+    Results are cached, since the same tweets are normalized again by the
+    initial and final duplicate checks and when archiving.
+    """
+    # Extract just the tweet text if it has a timestamp
+    if '] ' in text:
+        text = text.split('] ', 1)[1]
+    # Remove URLs
+    text = _URL_RE.sub('', text)
+    # Remove hashtags
+    text = _HASHTAG_RE.sub('', text)
+    # Remove timestamps and random numbers that might be added
+    text = _TIME_RE.sub('', text)
+    # Convert to lowercase and strip whitespace
+    return text.lower().strip()
+
+def get_url_keys(text):
+    """
+    Returns a ((domain, path), url) tuple for every URL in the text.
+    URLs without a domain are ignored.
+    """
+    keys = []
+    for url in _URL_RE.findall(text):
+        try:
+            parsed = urlparse(url)
+        except Exception as e:
+            logger.error(f"Error parsing URL {url}: {e}")
+            continue
+        if parsed.netloc:
+            keys.append(((parsed.netloc, parsed.path), url))
+    return keys
+
+# A posted tweet with the normalized forms used for similarity checks
+NormalizedTweet = namedtuple('NormalizedTweet', ['text', 'normalized', 'beginning_words', 'beginning', 'word_set'])
+
+def make_normalized_tweet(text):
+    """
+    Normalizes a tweet once and splits out everything the similarity
+    checks need: the first 5 words, their joined phrase and the word set.
+    """
+    normalized = normalize_text(text)
+    words = normalized.split()
+    beginning_words = words[:5]
+    return NormalizedTweet(text, normalized, beginning_words, ' '.join(beginning_words), frozenset(words))
+
+class RecentTweets:
+    """
+    Previously posted tweets used for duplicate detection.
+    
+    Alongside the raw tweet texts it keeps an index of every posted URL keyed
+    by (domain, path), so checking a new tweet for a reused link is a dict
+    lookup instead of re-parsing every URL in the archive. Each tweet is also
+    normalized once on append; tweets too short for similarity detection
+    are left out of the normalized entries. The set of normalized texts lets
+    exact reposts be caught without any similarity math.
+    """
+    def __init__(self, tweets=None):
+        self.tweets = []
+        self.entries = []
+        self.normalized_texts = set()
+        self.url_index = {}
+        for tweet in tweets or []:
+            self.append(tweet)
+    
+    def append(self, tweet):
+        self.tweets.append(tweet)
+        for key, url in get_url_keys(tweet):
+            self.url_index.setdefault(key, url)
+        entry = make_normalized_tweet(tweet)
+        # Very short tweets are skipped for similarity detection
+        if len(entry.normalized) >= 20:
+            self.entries.append(entry)
+            self.normalized_texts.add(entry.normalized)
+    
+    def fingerprint(self):
+        """
+        Returns a digest of the tweet texts, which changes whenever
+        any tweet is added, removed or edited.
+        """
+        digest = hashlib.sha1()
+        for tweet in self.tweets:
+            digest.update(tweet.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+    
+    def copy(self):
+        other = RecentTweets()
+        other.tweets = list(self.tweets)
+        other.entries = list(self.entries)
+        other.normalized_texts = set(self.normalized_texts)
+        other.url_index = dict(self.url_index)
+        return other
+    
+    def __iter__(self):
+        return iter(self.tweets)
+    
+    def __len__(self):
+        return len(self.tweets)
+
 def load_tweets():
     """
     Loads tweets from daily tweet file or falls back to platform-specific files.
@@ -154,6 +339,12 @@ def load_tweets():
         logger.error(f"Error loading tweets: {e}")
         return []
 
+# Today's history file and used tweet indices, once read by get_used_tweet_indices
+_used_indices_cache = None
+
+# Last result of load_recently_posted_tweets and the state of the files it was loaded from
+_recent_tweets_cache = None
+
 def load_recently_posted_tweets(days=30):
     """
     Loads tweets that have been posted in the last specified days.
@@ -164,17 +355,49 @@ def load_recently_posted_tweets(days=30):
     2. Recent daily history files (contains tweets posted on specific days)
     3. Recent tweet files (contains all available tweets, posted or not)
     
-    Returns a comprehensive list of all tweets for duplicate detection.
+    Returns a RecentTweets collection of all tweets for duplicate detection.
+    
+    The result is reused while none of the source files have been added,
+    removed or modified since the last call.
     """
+    global _recent_tweets_cache
+    
     recent_tweets = []
     archived_count = 0
     daily_count = 0
     file_count = 0
     
     try:
+        # Scan the tweets directory once and sort the files we need by kind
+        archive_name = f"{PLATFORM}_posted_tweets_archive.txt"
+        history_prefix = f"{PLATFORM}_posted_"
+        tweets_prefix = f"{PLATFORM}_tweets_"
+        archive_file = None
+        history_files = {}  # date string -> path of the posted history file
+        tweet_files = []  # DirEntry of every tweet file for this platform
+        file_states = []  # (name, mtime, size) of every file we read from
+        with os.scandir(TWEETS_DIR) as entries:
+            for entry in entries:
+                name = entry.name
+                if name == archive_name:
+                    archive_file = entry.path
+                elif name.startswith(history_prefix) and name.endswith(".json"):
+                    history_files[name[len(history_prefix):-5]] = entry.path
+                elif name.startswith(tweets_prefix) and name.endswith(".txt"):
+                    tweet_files.append(entry)
+                else:
+                    continue
+                stat = entry.stat()
+                file_states.append((name, stat.st_mtime_ns, stat.st_size))
+        
+        # Reuse the last result if the files and the date window are unchanged
+        cache_key = (days, datetime.now().strftime("%Y%m%d"), frozenset(file_states))
+        if _recent_tweets_cache is not None and _recent_tweets_cache[0] == cache_key:
+            logger.info(f"Tweet files unchanged, reusing {len(_recent_tweets_cache[1])} previously loaded tweets")
+            return _recent_tweets_cache[1].copy()
+        
         # STEP 1: Load from the permanent archive file (most comprehensive source)
-        archive_file = os.path.join(TWEETS_DIR, f"{PLATFORM}_posted_tweets_archive.txt")
-        if os.path.exists(archive_file):
+        if archive_file:
             try:
                 with open(archive_file, 'r', encoding='utf-8') as f:
                     content = f.read()
@@ -199,6 +422,7 @@ def load_recently_posted_tweets(days=30):
                 logger.error(f"Error reading tweets from archive file: {e}")
         else:
             # If the archive file doesn't exist, create it
+            archive_file = os.path.join(TWEETS_DIR, archive_name)
             logger.info(f"Archive file {archive_file} doesn't exist yet - will be created when tweets are posted")
         
         # STEP 2: Load from recent daily history files
@@ -211,18 +435,16 @@ def load_recently_posted_tweets(days=30):
         # Look for posted tweet history files from the last N days
         fallback_tweets = []
         for date_str in date_strings:
-            history_file = os.path.join(TWEETS_DIR, f"{PLATFORM}_posted_{date_str}.json")
-            if os.path.exists(history_file):
+            history_file = history_files.get(date_str)
+            if history_file:
                 logger.info(f"Found posted tweet history for {date_str}")
                 
                 # Find corresponding tweet files from that day
-                matching_tweet_files = [f for f in os.listdir(TWEETS_DIR) 
-                                       if f.startswith(f"{PLATFORM}_tweets_") 
-                                       and date_str in f 
-                                       and f.endswith(".txt")]
+                matching_tweet_files = [entry for entry in tweet_files if date_str in entry.name]
                 
-                for tweet_file in matching_tweet_files:
-                    file_path = os.path.join(TWEETS_DIR, tweet_file)
+                for tweet_entry in matching_tweet_files:
+                    tweet_file = tweet_entry.name
+                    file_path = tweet_entry.path
                     try:
                         with open(file_path, 'r', encoding='utf-8') as f:
                             content = f.read()
@@ -231,8 +453,7 @@ def load_recently_posted_tweets(days=30):
                         file_tweets = [tweet.strip() for tweet in content.split('---') if tweet.strip()]
                         
                         # Load the posted indices
-                        with open(history_file, 'r', encoding='utf-8') as f:
-                            posted_indices = json.load(f)
+                        posted_indices = load_json_file(history_file)
                         
                         # Add the tweets that were posted (if index is valid)
                         for idx in posted_indices:
@@ -250,17 +471,16 @@ def load_recently_posted_tweets(days=30):
         # STEP 3: As a final safety check, load recent tweet files (last 5) to ensure we don't miss anything
         try:
             # Get all tweet files for this platform
-            all_tweet_files = sorted([f for f in os.listdir(TWEETS_DIR) 
-                                if f.startswith(f"{PLATFORM}_tweets_") 
-                                and f.endswith(".txt")], reverse=True)
+            all_tweet_files = sorted(tweet_files, key=lambda entry: entry.name, reverse=True)
             
             # Use only the 5 most recent files
             recent_files = all_tweet_files[:5]
             
             # Load tweets from these files
             additional_tweets = []
-            for file in recent_files:
-                file_path = os.path.join(TWEETS_DIR, file)
+            for tweet_entry in recent_files:
+                file = tweet_entry.name
+                file_path = tweet_entry.path
                 try:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         content = f.read()
@@ -291,18 +511,39 @@ def load_recently_posted_tweets(days=30):
         logger.info(f"Total unique tweets loaded for similarity checking: {len(all_tweets)}")
         logger.info(f"Sources: Archive={archived_count}, Daily files={daily_count}, Recent files={file_count}")
         
-        return all_tweets
+        loaded = RecentTweets(all_tweets)
+        _recent_tweets_cache = (cache_key, loaded)
+        return loaded.copy()
         
     except Exception as e:
         logger.error(f"Error loading recent tweets: {e}")
-        return []
+        return RecentTweets()
+
+def similarity_ratio(a, b, cutoff=0.0):
+    """
+    Returns the similarity ratio (0.0-1.0) of two strings, or 0.0 if it is
+    below cutoff.
+    
+    Uses rapidfuzz's C++ implementation when available, which can stop early
+    once the cutoff is out of reach. Otherwise uses difflib, where
+    real_quick_ratio() and quick_ratio() are cheap upper bounds on ratio(),
+    so the expensive matching-block computation is skipped for pairs that
+    cannot reach the cutoff anyway.
+    """
+    if fuzz is not None:
+        return fuzz.ratio(a, b, score_cutoff=max(cutoff, 0.0) * 100) / 100.0
+    matcher = difflib.SequenceMatcher(None, a, b)
+    if cutoff > 0 and (matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff):
+        return 0.0
+    return matcher.ratio()
 
 def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
     """
     Checks if a tweet is too similar to any existing tweet.
     Returns True if similar, False otherwise.
     
-    Uses difflib's SequenceMatcher to calculate text similarity.
+    Uses similarity_ratio (rapidfuzz, or difflib's SequenceMatcher) to
+    calculate text similarity.
     
     Enhanced to detect duplicates by:
     1. Using word-based similarity checking (better for detecting paraphrased content)
@@ -313,94 +554,47 @@ def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
     if not existing_tweets:
         return False
     
-    # Normalize tweet for comparison (lowercase, remove URLs and hashtags)
-    def normalize_text(text):
-        # Extract just the tweet text if it has a timestamp
-        if '] ' in text:
-            text = text.split('] ', 1)[1]
-        # Remove URLs
-        text = re.sub(r'https?://\S+', '', text)
-        # Remove hashtags
-        text = re.sub(r'#\w+', '', text)
-        # Remove timestamps and random numbers that might be added
-        text = re.sub(r'\[\d{2}:\d{2}:\d{2}\]', '', text)
-        # Convert to lowercase and strip whitespace
-        return text.lower().strip()
-    
-    # Check if tweet contains a URL - treat it differently
-    has_url = bool(re.search(r'https?://\S+', tweet))
-    
-    # Extract the URL(s) from the tweet
-    urls = re.findall(r'https?://\S+', tweet) if has_url else []
-    
-    # Handle tweets with URLs specially
-    if has_url:
-        # For tweets with URLs, we want to avoid posting the same link with different text
-        # Extract the URL domain for comparison
-        domains = []
-        for url in urls:
-            try:
-                from urllib.parse import urlparse
-                domain = urlparse(url).netloc
-                if domain:
-                    domains.append(domain)
-            except Exception as e:
-                logger.error(f"Error parsing URL {url}: {e}")
-        
-        # If we have domains, check for duplicates with the same domain
-        if domains:
-            # Look for existing tweets with the same domains
-            for existing in existing_tweets:
-                existing_urls = re.findall(r'https?://\S+', existing)
-                
-                for existing_url in existing_urls:
-                    try:
-                        from urllib.parse import urlparse
-                        existing_domain = urlparse(existing_url).netloc
-                        
-                        # If we found a matching domain
-                        if existing_domain in domains:
-                            # Now check if the path is similar too
-                            for url in urls:
-                                url_path = urlparse(url).path
-                                existing_path = urlparse(existing_url).path
-                                
-                                # If we're posting the same exact URL
-                                if url_path == existing_path:
-                                    logger.warning(f"Duplicate URL detected: {url}")
-                                    logger.warning(f"Existing: {existing_url}")
-                                    logger.warning(f"New: {url}")
-                                    return True
-                    except Exception as e:
-                        logger.error(f"Error comparing URLs: {e}")
+    if not isinstance(existing_tweets, RecentTweets):
+        existing_tweets = RecentTweets(existing_tweets)
+    
+    # For tweets with URLs, we want to avoid posting the same link with different text
+    for key, url in get_url_keys(tweet):
+        existing_url = existing_tweets.url_index.get(key)
+        if existing_url is not None:
+            logger.warning(f"Duplicate URL detected: {url}")
+            logger.warning(f"Existing: {existing_url}")
+            logger.warning(f"New: {url}")
+            return True
     
-    normalized_tweet = normalize_text(tweet)
+    # Extract first few words (first 5) for checking similar beginnings
+    new_entry = make_normalized_tweet(tweet)
+    normalized_tweet = new_entry.normalized
+    beginning_words = new_entry.beginning_words
+    beginning_phrase = new_entry.beginning
+    tweet_words = new_entry.word_set
     
     # Skip very short tweets for similarity detection
     if len(normalized_tweet) < 20:
         return False
     
-    # Extract first few words for checking similar beginnings
-    words = normalized_tweet.split()
-    beginning_words = words[:5]  # Use first 5 words
-    beginning_phrase = ' '.join(beginning_words)
+    # An exact repost is always a duplicate
+    if normalized_tweet in existing_tweets.normalized_texts:
+        logger.warning(f"Tweet is an exact duplicate of an existing tweet")
+        logger.warning(f"New: {normalized_tweet[:60]}...")
+        return True
     
-    for existing in existing_tweets:
-        normalized_existing = normalize_text(existing)
-        
-        # Skip comparison with very short existing tweets
-        if len(normalized_existing) < 20:
-            continue
+    # Very short existing tweets were already left out of the entries
+    for existing in existing_tweets.entries:
+        normalized_existing = existing.normalized
         
         # First check for similar beginnings (highly indicative of duplicate content)
-        existing_words = normalized_existing.split()
-        existing_beginning_words = existing_words[:5]
-        existing_beginning_phrase = ' '.join(existing_beginning_words)
+        existing_beginning_words = existing.beginning_words
+        existing_beginning_phrase = existing.beginning
         
         # If beginnings are very similar, apply a stricter similarity check
         beginning_similarity = 0
         if len(beginning_words) >= 3 and len(existing_beginning_words) >= 3:
-            beginning_similarity = difflib.SequenceMatcher(None, beginning_phrase, existing_beginning_phrase).ratio()
+            beginning_similarity = similarity_ratio(beginning_phrase, existing_beginning_phrase)
             
             # If first 5 words are extremely similar (> 0.9), highly likely to be duplicate content
             if beginning_similarity >= 0.9:
@@ -410,12 +604,8 @@ def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
                 return True
         
         # For full content comparison, do different comparisons
-        # 1. Full content similarity
-        full_similarity = difflib.SequenceMatcher(None, normalized_tweet, normalized_existing).ratio()
-        
-        # 2. Word-set similarity (Jaccard similarity - how many words are the same)
-        tweet_words = set(normalized_tweet.split())
-        existing_words = set(normalized_existing.split())
+        # 1. Word-set similarity (Jaccard similarity - how many words are the same)
+        existing_words = existing.word_set
         if tweet_words and existing_words:
             intersection = tweet_words.intersection(existing_words)
             union = tweet_words.union(existing_words)
@@ -423,16 +613,22 @@ def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
         else:
             word_similarity = 0
             
-        # Calculate combined score with more weight on beginning similarity
-        combined_score = (full_similarity * 0.5) + (beginning_similarity * 0.3) + (word_similarity * 0.2)
-        
         # Adjust threshold based on how similar the beginnings are
         # More similar beginnings = lower threshold to detect duplicates
         adjusted_threshold = similarity_threshold
         if beginning_similarity >= 0.7:
             # Lower the threshold the more similar the beginnings are
             adjusted_threshold = max(0.5, similarity_threshold - (beginning_similarity - 0.7))
+        
+        # 2. Full content similarity
+        # It only matters if it reaches 0.7 on its own or lifts the combined score
+        # up to the (adjusted or logging) threshold, so use that as the cutoff
+        needed_for_combined = (min(adjusted_threshold, 0.7) - (beginning_similarity * 0.3) - (word_similarity * 0.2)) / 0.5
+        full_similarity = similarity_ratio(normalized_tweet, normalized_existing, min(0.7, needed_for_combined))
             
+        # Calculate combined score with more weight on beginning similarity
+        combined_score = (full_similarity * 0.5) + (beginning_similarity * 0.3) + (word_similarity * 0.2)
+        
         # Determine if this is a duplicate based on our scores
         is_duplicate = False
         
@@ -472,23 +668,28 @@ def save_used_tweet_ids(tweet_ids, tweets=None):
         tweet_ids: List of indices of the tweets that were posted
         tweets: Optional list of the actual tweet texts (if available)
     """
+    global _used_indices_cache
+    
     timestamp = datetime.now().strftime("%Y%m%d")
     history_file = os.path.join(TWEETS_DIR, f"{PLATFORM}_posted_{timestamp}.json")
     archive_file = os.path.join(TWEETS_DIR, f"{PLATFORM}_posted_tweets_archive.txt")
     
     try:
-        # Load existing history if it exists
+        # Load existing history, from memory if get_used_tweet_indices already read it
         existing_ids = []
-        if os.path.exists(history_file):
-            with open(history_file, 'r', encoding='utf-8') as f:
-                existing_ids = json.load(f)
+        if _used_indices_cache is not None and _used_indices_cache[0] == history_file:
+            existing_ids = _used_indices_cache[1]
+        elif os.path.exists(history_file):
+            existing_ids = load_json_file(history_file)
                 
         # Add new IDs
-        combined_ids = list(set(existing_ids + tweet_ids))
+        combined = set(existing_ids)
+        combined.update(tweet_ids)
+        combined_ids = list(combined)
         
         # Save back to file
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(combined_ids, f)
+        save_json_file(history_file, combined_ids)
+        _used_indices_cache = (history_file, combined_ids)
             
         logger.info(f"Saved {len(combined_ids)} used tweet IDs to {history_file}")
         
@@ -510,81 +711,194 @@ def save_used_tweet_ids(tweet_ids, tweets=None):
             except Exception as e:
                 logger.error(f"Error reading existing archive: {e}")
             
-            # Normalize tweets for comparison
-            def normalize_text(text):
-                # Extract just the tweet text if it has a timestamp
-                if '] ' in text:
-                    text = text.split('] ', 1)[1]
-                # Remove URLs
-                text = re.sub(r'https?://\S+', '', text)
-                # Remove hashtags
-                text = re.sub(r'#\w+', '', text)
-                # Remove timestamps and random numbers
-                text = re.sub(r'\[\d{2}:\d{2}:\d{2}\]', '', text)
-                # Convert to lowercase and strip whitespace
-                return text.lower().strip()
-                
-            # Normalize existing archive tweets
-            normalized_existing = [normalize_text(t) for t in existing_archive_tweets]
+            # Normalize existing archive tweets, skipping very short ones, and
+            # keep them sorted by length so candidates can be found by bisection
+            normalized_existing = sorted(
+                (n for n in map(normalize_text, existing_archive_tweets) if len(n) >= 20),
+                key=len
+            )
+            existing_lengths = [len(n) for n in normalized_existing]
             
-            # Archive new tweets that aren't already in the archive
-            new_archived = 0
-            with open(archive_file, 'a', encoding='utf-8') as f:
-                for tweet in tweets:
-                    # Check if this tweet is already in the archive
-                    normalized_tweet = normalize_text(tweet)
-                    
-                    # Skip very short tweets for comparison
-                    if len(normalized_tweet) < 20:
-                        # Just add it without checking
-                        archive_entry = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tweet}\n---\n"
-                        f.write(archive_entry)
-                        new_archived += 1
-                        continue
-                    
-                    # Check against existing archived tweets
-                    is_duplicate = False
-                    for existing in normalized_existing:
-                        # Skip very short existing tweets
-                        if len(existing) < 20:
-                            continue
-                            
-                        # Calculate similarity using sequence matcher
-                        import difflib
-                        similarity = difflib.SequenceMatcher(None, normalized_tweet, existing).ratio()
-                        
-                        # If similarity is too high, consider it a duplicate
-                        if similarity >= 0.9:
-                            logger.warning(f"Tweet already in archive (similarity: {similarity:.2f})")
-                            logger.warning(f"New: {normalized_tweet[:40]}...")
-                            logger.warning(f"Existing: {existing[:40]}...")
-                            is_duplicate = True
-                            break
-                    
-                    # If not a duplicate, add to archive
-                    if not is_duplicate:
-                        archive_entry = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tweet}\n---\n"
-                        f.write(archive_entry)
-                        new_archived += 1
-                        # Also add to our in-memory list for checking remaining tweets
-                        normalized_existing.append(normalized_tweet)
-                    else:
-                        logger.warning(f"Skipping duplicate tweet in archive")
+            # Collect new tweets that aren't already in the archive
+            archive_entries = []
+            for tweet in tweets:
+                # Check if this tweet is already in the archive
+                normalized_tweet = normalize_text(tweet)
+                
+                # Skip very short tweets for comparison
+                if len(normalized_tweet) < 20:
+                    # Just add it without checking
+                    archive_entry = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tweet}\n---\n"
+                    archive_entries.append(archive_entry)
+                    continue
+                
+                # Check against existing archived tweets
+                # The ratio is at most 2*min(a, b)/(a + b), so only tweets with
+                # 9*a <= 11*b and 9*b <= 11*a in length can reach 0.9
+                length = len(normalized_tweet)
+                lo = bisect.bisect_left(existing_lengths, -(-9 * length // 11))
+                hi = bisect.bisect_right(existing_lengths, 11 * length // 9)
+                is_duplicate = False
+                for existing in normalized_existing[lo:hi]:
+                    # Calculate similarity, only the 0.9 duplicate cutoff matters here
+                    similarity = similarity_ratio(normalized_tweet, existing, 0.9)
                     
+                    # If similarity is too high, consider it a duplicate
+                    if similarity >= 0.9:
+                        logger.warning(f"Tweet already in archive (similarity: {similarity:.2f})")
+                        logger.warning(f"New: {normalized_tweet[:40]}...")
+                        logger.warning(f"Existing: {existing[:40]}...")
+                        is_duplicate = True
+                        break
+                
+                # If not a duplicate, add to archive
+                if not is_duplicate:
+                    archive_entry = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tweet}\n---\n"
+                    archive_entries.append(archive_entry)
+                    # Also add to our in-memory list for checking remaining tweets
+                    position = bisect.bisect_right(existing_lengths, length)
+                    existing_lengths.insert(position, length)
+                    normalized_existing.insert(position, normalized_tweet)
+                else:
+                    logger.warning(f"Skipping duplicate tweet in archive")
+            
+            # Append all new entries to the archive in a single write
+            with open(archive_file, 'ab') as f:
+                f.write(''.join(archive_entries).encode('utf-8'))
+            new_archived = len(archive_entries)
+            
             logger.info(f"Archived {new_archived} new unique tweet texts to {archive_file}")
         
     except Exception as e:
         logger.error(f"Error saving used tweet IDs: {e}")
 
-def post_to_bluesky(tweet_text):
+def utf8_offsets(text):
+    """
+    Returns a table mapping every character position in text (including the
+    end) to its byte offset in the UTF-8 encoding of text.
+    """
+    # Running total of the UTF-8 width of each character
+    widths = (1 if code < 0x80 else 2 if code < 0x800 else 3 if code < 0x10000 else 4
+              for code in map(ord, text))
+    return list(accumulate(widths, initial=0))
+
+def build_post_record(tweet_text):
+    """
+    Prepares the Bluesky post record for a tweet, with link facets so URLs
+    are clickable. createdAt is left for post_to_bluesky to set.
+    
+    The tweet text will have its URLs shortened automatically if URL shortening is enabled
+    and the tweet is over the character limit or contains a long URL. Text still over
+    the limit is truncated, keeping the first URL.
+    """
+    # Find URLs in the tweet text
+    urls = _URL_RE.findall(tweet_text)
+    
+    # Shorten URLs in the tweet text to save characters, unless it already fits
+    if len(tweet_text) > BLUESKY_CHAR_LIMIT or any(len(url) > SHORT_URL_LENGTH for url in urls):
+        tweet_text = shorten_urls_in_text(tweet_text)
+        urls = _URL_RE.findall(tweet_text)
+    
+    if len(tweet_text) > BLUESKY_CHAR_LIMIT:
+        logger.warning(f"Tweet exceeds Bluesky's 300 character limit ({len(tweet_text)} chars). Truncating.")
+        
+        # Split the tweet into two parts if possible - main content and URL
+        main_content = tweet_text
+        url_part = ""
+        
+        # If we have URLs, extract the first one to preserve it
+        if urls:
+            # Find the main URL we want to preserve
+            main_url = urls[0]
+            
+            # Remove the URL from the content to measure length properly
+            url_part = main_url
+            main_content = tweet_text.replace(main_url, "")
+            
+            # Calculate how much space we have for the main content
+            # Allow for ellipsis and a space between content and URL
+            available_chars = BLUESKY_CHAR_LIMIT - len(url_part) - 4  # 4 chars for "... "
+            
+            # Truncate the main content
+            if available_chars > 20:  # Make sure we have enough space for meaningful content
+                # Find the last space before the limit
+                cutoff_point = main_content.rfind(' ', 0, available_chars)
+                if cutoff_point == -1:  # No space found
+                    cutoff_point = available_chars
+                
+                # Create the truncated tweet
+                truncated_text = main_content[:cutoff_point] + "... " + url_part
+            else:
+                # Not enough space for both content and URL, prioritize URL
+                # This is an edge case - URLs are usually short enough
+                truncated_text = main_content[:BLUESKY_CHAR_LIMIT - 4] + "..."
+        else:
+            # No URLs, just truncate the main content
+            cutoff_point = main_content.rfind(' ', 0, BLUESKY_CHAR_LIMIT - 4)
+            if cutoff_point == -1:
+                cutoff_point = BLUESKY_CHAR_LIMIT - 4
+            truncated_text = main_content[:cutoff_point] + "..."
+        
+        tweet_text = truncated_text
+        logger.info(f"Truncated tweet for Bluesky: {tweet_text}")
+        
+        # Refresh URLs after truncation
+        urls = _URL_RE.findall(tweet_text)
+    
+    # Base record for the post, createdAt is filled in when it is posted
+    record = {
+        'text': tweet_text,
+        'createdAt': None,
+        '$type': 'app.bsky.feed.post'
+    }
+    
+    # If URLs are found, create facets for proper link formatting
+    if urls:
+        facets = []
+        # Byte offset of every character for proper byte indexing
+        byte_offsets = utf8_offsets(tweet_text)
+        
+        # Walk the URL matches so repeated URLs each get their own position
+        for match in _URL_RE.finditer(tweet_text):
+            url = match.group()
+            char_start, char_end = match.span()
+            
+            # Convert to byte positions (important for Bluesky)
+            byte_start = byte_offsets[char_start]
+            byte_end = byte_offsets[char_end]
+            
+            # Create a facet for this URL
+            facet = {
+                'index': {
+                    'byteStart': byte_start,
+                    'byteEnd': byte_end
+                },
+                'features': [
+                    {
+                        '$type': 'app.bsky.richtext.facet#link',
+                        'uri': url
+                    }
+                ]
+            }
+            facets.append(facet)
+            logger.info("Created facet for URL: %s at byte positions %d-%d", url, byte_start, byte_end)
+        
+        # Add the facets to the record if we have any
+        if facets:
+            record['facets'] = facets
+            logger.info(f"Added {len(facets)} URL facets to Bluesky post")
+    
+    return record
+
+def post_to_bluesky(tweet_text, record=None):
     """
     Posts a tweet to Bluesky with proper link detection for clickable URLs.
     Returns True if successful, False otherwise.
     
-    The tweet text will have its URLs shortened automatically if URL shortening is enabled.
+    record can be a record already prepared by build_post_record for this
+    tweet; otherwise it is built here.
     """
-    # Shorten URLs in the tweet text to save characters
-    tweet_text = shorten_urls_in_text(tweet_text)
+    global _repo_did
     
     # Check credentials
     if not all([BLUESKY_USERNAME, BLUESKY_PASSWORD]):
@@ -592,121 +906,36 @@ def post_to_bluesky(tweet_text):
         return False
     
     try:
+        if record is None:
+            record = build_post_record(tweet_text)
+        
         # Authenticate with Bluesky using the newer API style
         client = AtprotoClient()
         logger.info(f"Attempting to login to Bluesky as {BLUESKY_USERNAME}")
         client.login(BLUESKY_USERNAME, BLUESKY_PASSWORD)
         logger.info(f"Successfully logged in to Bluesky as {BLUESKY_USERNAME}")
         
-        # Find URLs in the tweet text
-        url_pattern = r'https?://\S+'
-        urls = re.findall(url_pattern, tweet_text)
-        
-        # Enforce Bluesky character limit (300 graphemes)
-        # We'll use a much lower limit to be safe (250 characters)
-        # This is because the character count in Python is different from grapheme count in Bluesky
-        BLUESKY_CHAR_LIMIT = 250
-        if len(tweet_text) > BLUESKY_CHAR_LIMIT:
-            logger.warning(f"Tweet exceeds Bluesky's 300 character limit ({len(tweet_text)} chars). Truncating.")
-            
-            # Split the tweet into two parts if possible - main content and URL
-            main_content = tweet_text
-            url_part = ""
-            
-            # If we have URLs, extract the first one to preserve it
-            if urls:
-                # Find the main URL we want to preserve
-                main_url = urls[0]
-                
-                # Remove the URL from the content to measure length properly
-                url_part = main_url
-                main_content = tweet_text.replace(main_url, "")
-                
-                # Calculate how much space we have for the main content
-                # Allow for ellipsis and a space between content and URL
-                available_chars = BLUESKY_CHAR_LIMIT - len(url_part) - 4  # 4 chars for "... "
-                
-                # Truncate the main content
-                if available_chars > 20:  # Make sure we have enough space for meaningful content
-                    # Find the last space before the limit
-                    cutoff_point = main_content[:available_chars].rfind(' ')
-                    if cutoff_point == -1:  # No space found
-                        cutoff_point = available_chars
-                    
-                    # Create the truncated tweet
-                    truncated_text = main_content[:cutoff_point] + "... " + url_part
-                else:
-                    # Not enough space for both content and URL, prioritize URL
-                    # This is an edge case - URLs are usually short enough
-                    truncated_text = main_content[:BLUESKY_CHAR_LIMIT - 4] + "..."
-            else:
-                # No URLs, just truncate the main content
-                cutoff_point = main_content[:BLUESKY_CHAR_LIMIT - 4].rfind(' ')
-                if cutoff_point == -1:
-                    cutoff_point = BLUESKY_CHAR_LIMIT - 4
-                truncated_text = main_content[:cutoff_point] + "..."
-            
-            tweet_text = truncated_text
-            logger.info(f"Truncated tweet for Bluesky: {tweet_text}")
-            
-            # Refresh URLs after truncation
-            urls = re.findall(url_pattern, tweet_text)
+        # The account's DID doesn't change, so only look it up once
+        if _repo_did is None:
+            _repo_did = client.me.did
         
         # Current time in RFC-3339 format
-        current_time = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
-        
-        # Base record for the post
-        record = {
-            'text': tweet_text,
-            'createdAt': current_time,
-            '$type': 'app.bsky.feed.post'
-        }
-        
-        # If URLs are found, create facets for proper link formatting
-        if urls:
-            facets = []
-            # Convert text to bytes for proper byte indexing
-            tweet_bytes = tweet_text.encode('utf-8')
-            
-            for url in urls:
-                # Find the character position of the URL in the text
-                char_start = tweet_text.find(url)
-                
-                if char_start >= 0:
-                    char_end = char_start + len(url)
-                    
-                    # Convert to byte positions (important for Bluesky)
-                    byte_start = len(tweet_text[:char_start].encode('utf-8'))
-                    byte_end = len(tweet_text[:char_end].encode('utf-8'))
-                    
-                    # Create a facet for this URL
-                    facet = {
-                        'index': {
-                            'byteStart': byte_start,
-                            'byteEnd': byte_end
-                        },
-                        'features': [
-                            {
-                                '$type': 'app.bsky.richtext.facet#link',
-                                'uri': url
-                            }
-                        ]
-                    }
-                    facets.append(facet)
-                    logger.info(f"Created facet for URL: {url} at byte positions {byte_start}-{byte_end}")
-            
-            # Add the facets to the record if we have any
-            if facets:
-                record['facets'] = facets
-                logger.info(f"Added {len(facets)} URL facets to Bluesky post")
+        record['createdAt'] = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
         
-        # Log the final record structure for debugging
-        import json
-        logger.info(f"Posting to Bluesky with record: {json.dumps(record, indent=2)}")
+        # Log the final record structure for debugging, only serialized when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            if orjson is not None:
+                option = orjson.OPT_INDENT_2 if PRETTY_LOG_RECORD else 0
+                record_json = orjson.dumps(record, option=option).decode('utf-8')
+            elif PRETTY_LOG_RECORD:
+                record_json = json.dumps(record, indent=2)
+            else:
+                record_json = json.dumps(record, separators=(',', ':'))
+            logger.debug(f"Posting to Bluesky with record: {record_json}")
         
         # Create the post with properly formatted links
         response = client.app.bsky.feed.post.create(
-            repo=client.me.did,
+            repo=_repo_did,
             record=record
         )
         post_uri = str(response.cid)
@@ -719,36 +948,54 @@ def post_to_bluesky(tweet_text):
     except Exception as e:
         logger.error(f"Error posting to Bluesky: {e}")
         logger.error(f"Error type: {type(e).__name__}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        # The traceback is only formatted if the record is actually emitted
+        logger.error("Traceback:", exc_info=True)
         return False
 
 def get_used_tweet_indices():
     """
     Retrieves previously used tweet indices for today.
     Also, handle a special case where we want to reset if we have too many used indices.
+    
+    The history file is only read once per day; later calls and
+    save_used_tweet_ids use the in-memory copy. A reset only changes that
+    copy and is written out by save_used_tweet_ids.
     """
+    global _used_indices_cache
+    
     timestamp = datetime.now().strftime("%Y%m%d")
     history_file = os.path.join(TWEETS_DIR, f"{PLATFORM}_posted_{timestamp}.json")
     
+    if _used_indices_cache is not None and _used_indices_cache[0] == history_file:
+        return list(_used_indices_cache[1])
+    
     used_indices = []
     if os.path.exists(history_file):
         try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                used_indices = json.load(f)
+            used_indices = load_json_file(history_file)
                 
             # If we have used more than 50 tweets today, it's likely an error - reset the counter
             # This prevents the system from getting stuck in a state where it thinks all tweets are used
             if len(used_indices) > 50:
                 logger.warning(f"Found {len(used_indices)} used indices, which seems excessive. Resetting to empty.")
-                with open(history_file, 'w', encoding='utf-8') as f:
-                    json.dump([], f)
-                return []
+                used_indices = []
                 
         except Exception as e:
             logger.error(f"Error loading used tweet indices: {e}")
     
-    return used_indices
+    _used_indices_cache = (history_file, used_indices)
+    return list(used_indices)
+
+def reset_used_tweet_indices():
+    """
+    Resets today's used tweet indices to empty.
+    The history file is rewritten by the next save_used_tweet_ids call.
+    """
+    global _used_indices_cache
+    
+    timestamp = datetime.now().strftime("%Y%m%d")
+    history_file = os.path.join(TWEETS_DIR, f"{PLATFORM}_posted_{timestamp}.json")
+    _used_indices_cache = (history_file, [])
 
 def shorten_url(long_url):
     """
@@ -770,7 +1017,6 @@ def shorten_url(long_url):
         
     try:
         # URL encode the long URL to handle special characters
-        from urllib.parse import quote
         encoded_url = quote(long_url, safe='')
         
         # Try using TinyURL's simple API
@@ -817,9 +1063,8 @@ def shorten_urls_in_text(text):
         return text
         
     try:
-        # Find URLs in the text
-        url_pattern = r'https?://\S+'
-        urls = re.findall(url_pattern, text)
+        # Find URLs in the text, each distinct URL only needs shortening once
+        urls = list(dict.fromkeys(_URL_RE.findall(text)))
         
         if not urls:
             return text
@@ -838,7 +1083,102 @@ def shorten_urls_in_text(text):
         logger.error(f"Error processing URLs in text: {e}")
         return text
 
-def main(count=1, similarity_threshold=0.7, force=False, wait_time=5):
+def tweet_hash(text):
+    """
+    Returns a stable hash of a tweet's text for use as a cache key.
+    """
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def load_duplicate_check_cache(fingerprint, similarity_threshold):
+    """
+    Loads the cached duplicate verdicts (tweet hash -> is duplicate).
+    Returns an empty dict unless they were computed against the same
+    recent tweets and similarity threshold.
+    """
+    try:
+        if DUPLICATE_CHECK_CACHE_FILE.exists():
+            cache = load_json_file(DUPLICATE_CHECK_CACHE_FILE)
+            if cache.get('fingerprint') == fingerprint and cache.get('threshold') == similarity_threshold:
+                return cache.get('verdicts', {})
+    except Exception as e:
+        logger.warning(f"Error loading duplicate check cache: {e}")
+    return {}
+
+def save_duplicate_check_cache(fingerprint, similarity_threshold, verdicts):
+    """
+    Saves duplicate verdicts for the given recent tweets and threshold.
+    
+    The cache is written to a temporary file, synced and then renamed over
+    the old one, so an interrupted run never leaves a truncated cache behind.
+    """
+    cache = {'fingerprint': fingerprint, 'threshold': similarity_threshold, 'verdicts': verdicts}
+    temp_file = DUPLICATE_CHECK_CACHE_FILE.with_name(DUPLICATE_CHECK_CACHE_FILE.name + '.tmp')
+    try:
+        with open(temp_file, 'wb') as f:
+            if orjson is not None:
+                f.write(orjson.dumps(cache))
+            else:
+                f.write(json.dumps(cache, separators=(',', ':')).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, DUPLICATE_CHECK_CACHE_FILE)
+    except Exception as e:
+        logger.warning(f"Error saving duplicate check cache: {e}")
+
+def compute_uniqueness_scores(texts):
+    """
+    Scores how unique each tweet is compared to the other tweets (0.0-1.0).
+    
+    A tweet's score is 1 minus its average TF-IDF cosine similarity (words
+    and word pairs, URLs and hashtags removed) to every other tweet. The sum
+    of a tweet's similarities is its dot product with the sum of all tweet
+    vectors minus itself, so no pairwise similarity matrix is needed.
+    Without numpy, falls back to the average difflib similarity of every pair.
+    """
+    n = len(texts)
+    if n < 2:
+        return [1.0] * n
+    
+    normalized = [_HASHTAG_RE.sub('', _URL_RE.sub('', text)).lower().strip() for text in texts]
+    
+    if np is None:
+        scores = []
+        for i, tweet in enumerate(normalized):
+            total_similarity = 0
+            for j, other in enumerate(normalized):
+                if i != j:
+                    total_similarity += difflib.SequenceMatcher(None, tweet, other).ratio()
+            scores.append(1 - total_similarity / (n - 1))
+        return scores
+    
+    # Sparse term counts as parallel (row, term, count) arrays
+    vocabulary = {}
+    rows, terms, counts = [], [], []
+    for row, text in enumerate(normalized):
+        words = _WORD_RE.findall(text)
+        term_counts = Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+        for term, term_count in term_counts.items():
+            rows.append(row)
+            terms.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(term_count)
+    if not vocabulary:
+        return [1.0] * n
+    rows = np.array(rows)
+    terms = np.array(terms)
+    
+    # Smoothed IDF weights, then L2-normalize every tweet vector
+    document_frequency = np.bincount(terms, minlength=len(vocabulary))
+    idf = np.log((1 + n) / (1 + document_frequency)) + 1
+    values = np.array(counts, dtype=float) * idf[terms]
+    values /= np.sqrt(np.bincount(rows, weights=values * values, minlength=n))[rows]
+    
+    # Similarity of each tweet to all the others
+    total_vector = np.bincount(terms, weights=values, minlength=len(vocabulary))
+    similarity_sums = (np.bincount(rows, weights=values * total_vector[terms], minlength=n)
+                       - np.bincount(rows, weights=values * values, minlength=n))
+    return (1 - similarity_sums / (n - 1)).tolist()
+
+def main(count=1, similarity_threshold=0.7, force=False, wait_time=5, verbose_env=False):
     """
     Main function to post tweets to Bluesky.
     
@@ -848,34 +1188,36 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=5):
                               Higher values allow more similar tweets to be posted
         force: If True, bypass similarity checks completely (emergency override)
         wait_time: Time to wait between posts in seconds (default: 5)
+        verbose_env: If True, log details of the .env files that were found
     """
     # Print environment info for debugging
-    import sys
-    
     logger.info("======== ENVIRONMENT DIAGNOSTICS ========")
     logger.info(f"🔍 Python version: {sys.version}")
     logger.info(f"🔍 Current working directory: {os.getcwd()}")
-    logger.info(f"🔍 Script directory: {os.path.dirname(os.path.abspath(__file__))}")
+    logger.info(f"🔍 Script directory: {SCRIPT_DIR}")
     logger.info(f"🔍 Platform: {PLATFORM}")
     logger.info(f"🔍 Number of tweets to post: {count}")
     logger.info(f"🔍 Wait time between posts: {wait_time} seconds")
     
     # Check .env files for proper loading
-    from pathlib import Path
     env_paths = [
-        Path(__file__).resolve().parent.parent / '.env',
-        Path(__file__).resolve().parent / '.env'
+        PROJECT_ROOT / '.env',
+        SCRIPT_DIR / '.env'
     ]
     
-    for path in env_paths:
-        if path.exists():
-            logger.info(f"✅ Found .env file at: {path}")
-            with open(path, 'r') as f:
-                lines = f.readlines()
-                logger.info(f"  - File has {len(lines)} lines")
-                logger.info(f"  - First few keys: {', '.join([line.split('=')[0] for line in lines[:3] if '=' in line])}")
-        else:
-            logger.warning(f"❌ No .env file found at: {path}")
+    if verbose_env:
+        for path in env_paths:
+            if path.exists():
+                logger.info("✅ Found .env file at: %s", path)
+                with open(path, 'r') as f:
+                    lines = f.readlines()
+                    logger.info("  - File has %d lines", len(lines))
+                    logger.info("  - First few keys: %s", ', '.join([line.split('=')[0] for line in lines[:3] if '=' in line]))
+            else:
+                logger.warning("❌ No .env file found at: %s", path)
+    elif logger.isEnabledFor(logging.DEBUG):
+        for path in env_paths:
+            logger.debug(".env file at %s exists: %s", path, path.exists())
     
     posted_indices = []
     
@@ -888,10 +1230,8 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=5):
         # Create empty archive file
         logger.info(f"Creating empty archive file at {archive_file}")
         try:
-            with open(archive_file, 'w', encoding='utf-8') as f:
-                f.write("# Archive of all posted tweets for similarity detection\n")
-                f.write("# Format: [timestamp] tweet text\n")
-                f.write("# Separator: ---\n\n")
+            with open(archive_file, 'wb') as f:
+                f.write(ARCHIVE_HEADER)
         except Exception as e:
             logger.error(f"Failed to create archive file {archive_file}: {e}")
     
@@ -916,14 +1256,12 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=5):
     if len(used_indices) > 0 and len(used_indices) >= len(tweets) * 0.8:
         logger.warning(f"Too many used indices ({len(used_indices)}) compared to available tweets ({len(tweets)}). Resetting used indices.")
         used_indices = []
-        # Reset the history file
-        timestamp = datetime.now().strftime("%Y%m%d")
-        history_file = os.path.join(TWEETS_DIR, f"{PLATFORM}_posted_{timestamp}.json")
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump([], f)
+        # Reset the history, written out when the posted tweet IDs are saved
+        reset_used_tweet_indices()
     
     # Get available indices (not used today)
-    available_indices = [i for i in range(len(tweets)) if i not in used_indices]
+    used_set = set(used_indices)
+    available_indices = [i for i in range(len(tweets)) if i not in used_set]
     logger.info(f"Found {len(available_indices)} available tweets to post")
     
     if not available_indices:
@@ -937,6 +1275,12 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=5):
     
     logger.info(f"Performing content-based duplicate check on {len(available_indices)} available tweets...")
     
+    # Reuse verdicts from the last run if the recent tweets haven't changed since
+    if not force:
+        recent_fingerprint = recent_tweets.fingerprint()
+        cached_verdicts = load_duplicate_check_cache(recent_fingerprint, similarity_threshold)
+        verdicts = {}
+    
     for idx in available_indices:
         tweet = tweets[idx]
         
@@ -945,19 +1289,31 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=5):
         
         # Skip duplicate check if force mode is enabled
         if force:
-            logger.info(f"FORCE mode enabled - bypassing duplicate checks for tweet #{idx}")
+            logger.info("FORCE mode enabled - bypassing duplicate checks for tweet #%d", idx)
             double_checked_indices.append(idx)
             continue
         
         # Check duplicate by content
-        if is_similar_to_existing(tweet, recent_tweets, similarity_threshold):
-            logger.warning(f"Tweet #{idx} content matches an existing tweet. Marking as duplicate.")
+        key = tweet_hash(tweet)
+        is_similar = cached_verdicts.get(key)
+        if is_similar is None:
+            is_similar = is_similar_to_existing(tweet, recent_tweets, similarity_threshold)
+        verdicts[key] = is_similar
+        
+        if is_similar:
+            logger.warning("Tweet #%d content matches an existing tweet. Marking as duplicate.", idx)
             duplicate_count += 1
             is_duplicate = True
         
         if not is_duplicate:
             double_checked_indices.append(idx)
     
+    if not force and verdicts != cached_verdicts:
+        save_duplicate_check_cache(recent_fingerprint, similarity_threshold, verdicts)
+    
+    # Size of the recent tweet pool the tweets above were checked against
+    checked_recent_count = len(recent_tweets)
+    
     logger.info(f"Content duplicate check found {duplicate_count} duplicates, {len(double_checked_indices)} tweets passed")
     
     # Now use the double-checked indices instead of the original available indices
@@ -969,67 +1325,44 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=5):
     
     # Calculate uniqueness scores for each available tweet
     logger.info("Ranking tweets by uniqueness score...")
-    tweet_uniqueness_scores = []
+    uniqueness_scores = compute_uniqueness_scores([tweets[idx] for idx in available_indices])
+    tweet_uniqueness_scores = [(idx, uniqueness_score, tweets[idx])
+                               for idx, uniqueness_score in zip(available_indices, uniqueness_scores)]
     
-    for idx in available_indices:
-        tweet = tweets[idx]
-        # Calculate uniqueness by comparing this tweet to all other available tweets
-        total_similarity = 0
-        comparisons = 0
-        
-        for other_idx in available_indices:
-            if idx == other_idx:
-                continue
-                
-            other_tweet = tweets[other_idx]
-            # Use difflib to measure similarity
-            import difflib
-            
-            # Normalize for comparison
-            def normalize_text(text):
-                text = re.sub(r'https?://\S+', '', text)
-                text = re.sub(r'#\w+', '', text)
-                return text.lower().strip()
-            
-            normalized_tweet = normalize_text(tweet)
-            normalized_other = normalize_text(other_tweet)
-            
-            # Calculate similarity
-            similarity = difflib.SequenceMatcher(None, normalized_tweet, normalized_other).ratio()
-            total_similarity += similarity
-            comparisons += 1
-        
-        # Calculate average similarity, then convert to uniqueness score
-        avg_similarity = total_similarity / max(comparisons, 1)
-        uniqueness_score = 1 - avg_similarity
-        
-        tweet_uniqueness_scores.append((idx, uniqueness_score, tweet))
-        logger.info(f"Tweet #{idx} uniqueness score: {uniqueness_score:.2f}")
-    
-    # Sort by uniqueness score (highest first)
-    tweet_uniqueness_scores.sort(key=lambda x: x[1], reverse=True)
+    # Log all scores in a single line
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Uniqueness scores: %s",
+                    ', '.join(f"#{idx}={score:.2f}" for idx, score, _ in tweet_uniqueness_scores))
     
-    # Choose the most unique tweets up to the requested count
+    # Choose the most unique tweets (highest score first) up to the requested count
     num_to_post = min(count, len(tweet_uniqueness_scores))
-    indices_to_post = [idx for idx, _, _ in tweet_uniqueness_scores[:num_to_post]]
+    top_scores = nlargest(num_to_post, tweet_uniqueness_scores, key=lambda x: x[1])
+    indices_to_post = [idx for idx, _, _ in top_scores]
     
     # Log the selected tweets with their uniqueness scores
     logger.info("Selected tweets by uniqueness ranking:")
-    for i, (idx, score, tweet_text) in enumerate(tweet_uniqueness_scores[:num_to_post]):
-        logger.info(f"  {i+1}. Tweet #{idx} (score: {score:.2f}): {tweet_text[:50]}...")
+    for i, (idx, score, tweet_text) in enumerate(top_scores):
+        logger.info("  %d. Tweet #%d (score: %.2f): %.50s...", i + 1, idx, score, tweet_text)
     logger.info(f"Selected {len(indices_to_post)} tweets to post")
     
     # Final sanity check: one last check for duplicates before posting
     skipped_indices = []
     final_indices_to_post = []
     
-    logger.info("Performing final duplicate check before posting...")
+    # Every selected tweet already passed the check against the first checked_recent_count
+    # recent tweets, so only tweets added to the pool since then need checking
+    new_recent_tweets = RecentTweets(recent_tweets.tweets[checked_recent_count:])
+    if new_recent_tweets:
+        logger.info("Performing final duplicate check before posting...")
+    else:
+        logger.info("No tweets added since the duplicate check, skipping final check")
+    
     for idx in indices_to_post:
         tweet = tweets[idx]
         
         # One last check against recent tweets to be safe
-        if not force and is_similar_to_existing(tweet, recent_tweets, similarity_threshold):
-            logger.warning(f"Final check: Tweet #{idx} still seems to be a duplicate. Skipping.")
+        if not force and new_recent_tweets and is_similar_to_existing(tweet, new_recent_tweets, similarity_threshold):
+            logger.warning("Final check: Tweet #%d still seems to be a duplicate. Skipping.", idx)
             skipped_indices.append(idx)
             continue
             
@@ -1047,35 +1380,55 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=5):
     posted_tweet_texts = []
 
     # Post with a short wait time between posts to be safe
-    for i, idx in enumerate(final_indices_to_post):
-        tweet = tweets[idx]
-        logger.info(f"Posting tweet #{idx}: {tweet[:50]}...")
+    # The next post's record is prepared in the background while waiting
+    next_post_time = 0
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_record = executor.submit(build_post_record, tweets[final_indices_to_post[0]])
         
-        # Post to Bluesky
-        success = post_to_bluesky(tweet)
-        
-        if success:
-            platform_posted.append(idx)
-            posted_indices.append(idx)
-            posted_tweet_texts.append(tweet)
-            logger.info(f"Successfully posted tweet #{idx}")
-            
-            # Add tweet to in-memory list of recent tweets to prevent posting duplicates in same batch
-            recent_tweets.append(tweet)
+        for i, idx in enumerate(final_indices_to_post):
+            tweet = tweets[idx]
             
-            # Add a delay between posts to be safe
-            # Only add delay if this isn't the last tweet
+            try:
+                record = next_record.result()
+            except Exception as e:
+                # post_to_bluesky will try to build it again and report any error
+                logger.error(f"Error preparing record for tweet #{idx}: {e}")
+                record = None
             if i < len(final_indices_to_post) - 1:
-                logger.info(f"Waiting {wait_time} seconds before next post...")
-                time.sleep(wait_time)
-        else:
-            logger.error(f"Failed to post tweet #{idx}")
+                next_record = executor.submit(build_post_record, tweets[final_indices_to_post[i + 1]])
+            
+            # Wait for whatever remains of the delay after the previous post
+            delay = next_post_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            
+            logger.info(f"Posting tweet #{idx}: {tweet[:50]}...")
+            
+            # Post to Bluesky
+            success = post_to_bluesky(tweet, record)
+            
+            if success:
+                platform_posted.append(idx)
+                posted_indices.append(idx)
+                posted_tweet_texts.append(tweet)
+                logger.info(f"Successfully posted tweet #{idx}")
+                
+                # Add tweet to in-memory list of recent tweets to prevent posting duplicates in same batch
+                recent_tweets.append(tweet)
+                
+                # Add a delay between posts to be safe
+                # Only add delay if this isn't the last tweet
+                if i < len(final_indices_to_post) - 1:
+                    logger.info(f"Waiting {wait_time} seconds before next post...")
+                    next_post_time = time.monotonic() + wait_time
+            else:
+                logger.error(f"Failed to post tweet #{idx}")
     
     # Save posted indices and ONLY the tweets that were actually posted
     if platform_posted:
         logger.info(f"Saving {len(platform_posted)} used tweet IDs")
         logger.info(f"Archiving {len(posted_tweet_texts)} successfully posted tweets")
-        save_used_tweet_ids(used_indices + platform_posted, posted_tweet_texts)  # Only archive successfully posted tweets
+        save_used_tweet_ids(sorted(used_set.union(platform_posted)), posted_tweet_texts)  # Only archive successfully posted tweets
         logger.info(f"✅ Posted {len(platform_posted)} tweets successfully")
     else:
         logger.warning(f"❌ No tweets were successfully posted")
@@ -1083,9 +1436,6 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=5):
     logger.info(f"Posting to {PLATFORM} completed.")
 
 if __name__ == "__main__":
-    # Create logs directory if it doesn't exist
-    os.makedirs(os.path.join(os.path.dirname(__file__), '../logs'), exist_ok=True)
-    
     # Parse command line arguments
     parser = argparse.ArgumentParser(description=f"Post tweets to {PLATFORM}")
     parser.add_argument("--count", type=int, default=1, help="Number of tweets to post (default: 1)")
@@ -1097,6 +1447,10 @@ if __name__ == "__main__":
                        help="Disable URL shortening for posts")
     parser.add_argument("--wait-time", type=int, default=5,
                       help="Time to wait between posts in seconds (default: 5)")
+    parser.add_argument("--verbose-env", action="store_true",
+                       help="Log details of the .env files that were found")
+    parser.add_argument("--pretty-log-record", action="store_true",
+                       help="Pretty-print post records in debug logs")
     args = parser.parse_args()
     
     # Apply command-line settings
@@ -1104,6 +1458,8 @@ if __name__ == "__main__":
         # No need for global declaration here since it's already at module level
         USE_URL_SHORTENER = False
         logger.info("URL shortening disabled by command-line argument")
+    if args.pretty_log_record:
+        PRETTY_LOG_RECORD = True
     
     # Call main function
-    main(args.count, args.similarity_threshold, args.force, args.wait_time)
\ No newline at end of file
+    main(args.count, args.similarity_threshold, args.force, args.wait_time, args.verbose_env)
\ No newline at end of file
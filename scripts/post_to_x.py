@@ -7,12 +7,39 @@ import random
 import tweepy
 import logging
 import argparse
+import atexit
+import bisect
 import difflib
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+from heapq import nlargest
 # Updated to work with atproto 0.0.61
 from pathlib import Path
 
+# rapidfuzz is optional; fall back to difflib when it is not installed
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = None
+    process = None
+
+# orjson is optional; fall back to the json module when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# numpy is optional; uniqueness ranking falls back to difflib without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Try to load environment variables from .env file for local development
 try:
     from dotenv import load_dotenv
@@ -65,14 +92,225 @@ USE_URL_SHORTENER = True
 # Hard-code the platform for this script
 PLATFORM = "x"
 
-def load_tweets():
+# Shared HTTP session for the URL shortener, so repeated requests reuse pooled connections
+_http_session = requests.Session()
+_http_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=1))
+_http_session.headers.update({'User-Agent': f'{PLATFORM}-tweet-poster'})
+
+# Persistent long URL -> short URL mappings, so a link is only shortened once across runs
+URL_CACHE_FILE = os.path.join(TWEETS_DIR, 'url_shorten_cache.json')
+_url_cache = None
+_url_cache_dirty = False
+
+# Duplicate check verdicts from the last run, reused while the recent tweets are unchanged
+DUPLICATE_CHECK_CACHE_FILE = os.path.join(TWEETS_DIR, f"{PLATFORM}_duplicate_check_cache.json")
+
+def find_suspicious_credentials():
+    """
+    Returns the names of the Twitter API credentials that contain invisible
+    or non-ASCII characters, which usually means they were pasted with extra
+    characters and will fail to authenticate.
+    """
+    suspicious = []
+    for var_name, var_value in {
+        'X_API_KEY': X_API_KEY,
+        'X_API_SECRET': X_API_SECRET,
+        'X_ACCESS_TOKEN': X_ACCESS_TOKEN,
+        'X_ACCESS_SECRET': X_ACCESS_SECRET
+    }.items():
+        if var_value:
+            # Check for invisible characters
+            has_invisible = any(c.isspace() and c != ' ' for c in var_value)
+            has_non_ascii = not var_value.isascii()
+            if has_invisible or has_non_ascii:
+                suspicious.append(var_name)
+    return suspicious
+
+# The credentials can't change while the script runs, so check them once at startup
+SUSPICIOUS_CREDENTIALS = find_suspicious_credentials()
+for var_name in SUSPICIOUS_CREDENTIALS:
+    logger.warning(f"{var_name} contains invisible or non-ASCII characters")
+
+# Shared tweepy client and whether its credentials have been verified, see get_twitter_client
+_twitter_client = None
+_twitter_client_verified = False
+
+# When X's rate limit resets (epoch seconds), from the last rate-limited post attempt
+_rate_limit_reset = None
+
+# Ensure tweets are within Twitter's character limit
+TWITTER_CHAR_LIMIT = 280
+
+# Patterns stripped from tweets before similarity checks
+_URL_RE = re.compile(r'https?://\S+')
+_HASH_RE = re.compile(r'#\w+')
+_TS_RE = re.compile(r'\[\d{2}:\d{2}:\d{2}\]')
+
+# Domain and path of a URL matched by _URL_RE
+_URL_PARTS_RE = re.compile(r'https?://([^/?#]*)([^?#]*)')
+
+# Timestamp prefix of an archive entry, e.g. "[2025-01-01 12:00:00] "
+_ARCHIVE_TS_RE = re.compile(r'\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] ')
+
+# Any mention of Elon Musk, matched anywhere in the text like a substring check
+_ELON_RE = re.compile(r'elon|musk', re.IGNORECASE)
+
+def load_json_file(path):
+    """
+    Loads a JSON file such as a posted tweet history file.
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_json_file(path, data):
+    """
+    Saves data to a JSON file in compact form.
+    
+    The data is written to a temporary file, synced and then renamed over
+    the old one, so an interrupted run never leaves a truncated file behind.
+    """
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'wb') as f:
+        if orjson is not None:
+            f.write(orjson.dumps(data))
+        else:
+            f.write(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
+
+def normalize_text(text):
+    """
+    Normalizes a tweet for similarity comparison:
+    lowercase, without URLs, hashtags and added timestamps.
+    """
+    # Extract just the tweet text if it has a timestamp
+    if '] ' in text:
+        text = text.split('] ', 1)[1]
+    # Remove URLs
+    text = _URL_RE.sub('', text)
+    # Remove hashtags
+    text = _HASH_RE.sub('', text)
+    # Remove timestamps and random numbers that might be added
+    text = _TS_RE.sub('', text)
+    # Convert to lowercase and strip whitespace
+    return text.lower().strip()
+
+def split_url(url):
+    """
+    Returns the (domain, path) of a URL matched by _URL_RE.
+    These are the same netloc and path urlparse gives, from a single regex match.
+    """
+    domain, path = _URL_PARTS_RE.match(url).groups()
+    # urlparse leaves ;params on the last path segment out of the path
+    if ';' in path:
+        cut = path.find(';', path.rfind('/'))
+        if cut >= 0:
+            path = path[:cut]
+    return domain, path
+
+# A posted tweet with the normalized forms used for similarity checks
+NormalizedTweet = namedtuple('NormalizedTweet', ['text', 'normalized', 'beginning_words', 'beginning', 'word_set'])
+
+def make_normalized_tweet(text):
+    """
+    Normalizes a tweet once and splits out everything the similarity
+    checks need: the first 5 words, their joined phrase and the word set.
+    """
+    normalized = normalize_text(text)
+    words = normalized.split()
+    beginning_words = words[:5]
+    return NormalizedTweet(text, normalized, beginning_words, ' '.join(beginning_words), frozenset(words))
+
+class RecentTweets:
+    """
+    Previously posted tweets used for duplicate detection.
+    
+    Each tweet is normalized once when it is added, so the duplicate checks
+    for every candidate tweet reuse the same normalized text, beginning
+    phrase and word set. Tweets too short for similarity detection are left
+    out of the normalized entries.
+    
+    Every posted URL is also indexed by its (domain, path), so checking a new
+    tweet for a reused link is a few dict lookups instead of a scan of
+    every URL in the archive.
+    """
+    def __init__(self, tweets=None):
+        self.tweets = []
+        self.entries = []
+        self.url_index = {}
+        for tweet in tweets or []:
+            self.append(tweet)
+    
+    def append(self, tweet):
+        self.tweets.append(tweet)
+        for url in _URL_RE.findall(tweet):
+            self.url_index.setdefault(split_url(url), url)
+        entry = make_normalized_tweet(tweet)
+        # Very short tweets are skipped for similarity detection
+        if len(entry.normalized) >= 20:
+            self.entries.append(entry)
+    
+    def fingerprint(self):
+        """
+        Returns a digest of the tweet texts, which changes whenever
+        any tweet is added, removed or edited.
+        """
+        digest = hashlib.sha1()
+        for tweet in self.tweets:
+            digest.update(tweet.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+    
+    def __iter__(self):
+        return iter(self.tweets)
+    
+    def __len__(self):
+        return len(self.tweets)
+
+# Files found in the tweets directory, as returned by scan_tweet_dir
+TweetDirScan = namedtuple('TweetDirScan', ['tweet_files', 'history_files', 'archive_file'])
+
+def scan_tweet_dir():
+    """
+    Scans the tweets directory once and sorts the files for this platform by kind.
+    
+    Returns a TweetDirScan with the sorted names of the tweet files, a dict of
+    date string -> path of the posted history files, and the path of the
+    archive file (None if it doesn't exist).
+    """
+    tweets_prefix = f"{PLATFORM}_tweets_"
+    history_prefix = f"{PLATFORM}_posted_"
+    archive_name = f"{PLATFORM}_posted_tweets_archive.txt"
+    tweet_files = []
+    history_files = {}
+    archive_file = None
+    with os.scandir(TWEETS_DIR) as entries:
+        for entry in entries:
+            name = entry.name
+            if name == archive_name:
+                archive_file = entry.path
+            elif name.startswith(history_prefix) and name.endswith(".json"):
+                history_files[name[len(history_prefix):-5]] = entry.path
+            elif name.startswith(tweets_prefix) and name.endswith(".txt"):
+                tweet_files.append(name)
+    tweet_files.sort()
+    return TweetDirScan(tweet_files, history_files, archive_file)
+
+def load_tweets(scan=None):
     """
     Loads tweets from multiple recent platform-specific tweet files.
     Returns a list of all tweets across files.
+    
+    Args:
+        scan: Optional TweetDirScan to reuse instead of scanning the directory again
     """
     try:
         # List all tweet files for the specified platform
-        tweet_files = [f for f in os.listdir(TWEETS_DIR) if f.startswith(f"{PLATFORM}_tweets_") and f.endswith(".txt")]
+        tweet_files = list((scan or scan_tweet_dir()).tweet_files)
         
         if not tweet_files:
             logger.error(f"No tweet files found for platform: {PLATFORM}")
@@ -116,7 +354,58 @@ def load_tweets():
         logger.error(f"Error loading tweets: {e}")
         return []
 
-def load_recently_posted_tweets(days=30):
+def read_text_file(path):
+    """
+    Reads a whole UTF-8 text file.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def read_archive_entries(path):
+    """
+    Reads the entries of an archive file line by line, without loading the
+    whole file into memory first. The '#' header lines at the top of the file
+    are skipped, and entries keep their timestamp prefix.
+    """
+    entries = []
+    lines = []
+    in_header = True
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if in_header:
+                if line.startswith('#'):
+                    continue
+                in_header = False
+            if line.strip() == '---':
+                entry = ''.join(lines).strip()
+                if entry:
+                    entries.append(entry)
+                lines.clear()
+            else:
+                lines.append(line)
+    entry = ''.join(lines).strip()
+    if entry:
+        entries.append(entry)
+    return entries
+
+@lru_cache(maxsize=1)
+def read_archive_snapshot(path, mtime_ns, size):
+    """
+    Returns the entries of one version of an archive file as a tuple.
+    The modification time and size are only part of the cache key, so the
+    file is read again once it changes.
+    """
+    return tuple(read_archive_entries(path))
+
+def load_archive_entries(path):
+    """
+    Returns the entries of an archive file, reusing the entries read last
+    time while the file's modification time and size are unchanged.
+    """
+    stat = os.stat(path)
+    return read_archive_snapshot(path, stat.st_mtime_ns, stat.st_size)
+
+def load_recently_posted_tweets(days=30, scan=None):
     """
     Loads tweets that have been posted in the last specified days.
     This helps detect similarity with recently posted content.
@@ -126,34 +415,63 @@ def load_recently_posted_tweets(days=30):
     2. Recent daily history files (contains tweets posted on specific days)
     3. Recent tweet files (contains all available tweets, posted or not)
     
-    Returns a comprehensive list of all tweets for duplicate detection.
+    Returns a RecentTweets collection of all tweets for duplicate detection.
+    
+    Args:
+        days: Number of days of posted history to load
+        scan: Optional TweetDirScan to reuse instead of scanning the directory again
     """
     recent_tweets = []
+    # Every tweet text added from any source, for constant-time duplicate checks
+    seen_tweets = set()
     archived_count = 0
     daily_count = 0
     file_count = 0
     
     try:
-        # STEP 1: Load from the permanent archive file (most comprehensive source)
+        # Work out every file we need up front from a single directory scan
+        scan = scan or scan_tweet_dir()
+        tweet_files = scan.tweet_files
         archive_file = os.path.join(TWEETS_DIR, f"{PLATFORM}_posted_tweets_archive.txt")
-        if os.path.exists(archive_file):
+        has_archive = scan.archive_file is not None
+        
+        # Get date strings for the last N days
+        date_strings = []
+        for i in range(days):
+            date = (datetime.now() - timedelta(days=i)).strftime("%Y%m%d")
+            date_strings.append(date)
+        history_dates = [date_str for date_str in date_strings if date_str in scan.history_files]
+        
+        # Use only the 5 most recent tweet files for the final safety check
+        recent_files = tweet_files[::-1][:5]
+        
+        files_to_read = []
+        for date_str in history_dates:
+            files_to_read.append(scan.history_files[date_str])
+            files_to_read.extend(os.path.join(TWEETS_DIR, f) for f in tweet_files if date_str in f)
+        files_to_read.extend(os.path.join(TWEETS_DIR, f) for f in recent_files)
+        
+        # Read all the files concurrently, the results are parsed below in the usual order.
+        # A failed read raises its error again when the result is fetched.
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            if has_archive:
+                archive_read = executor.submit(load_archive_entries, archive_file)
+            file_reads = {path: executor.submit(read_text_file, path) for path in dict.fromkeys(files_to_read)}
+        
+        # STEP 1: Load from the permanent archive file (most comprehensive source)
+        if has_archive:
             try:
-                with open(archive_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Split by the separator and filter out empty entries
-                archived_tweets = [tweet.strip() for tweet in content.split('---') if tweet.strip()]
+                archived_tweets = archive_read.result()
                 
                 # Extract the actual tweet text (remove the timestamp prefix if present)
                 for tweet in archived_tweets:
                     # If the tweet has our timestamp format, extract just the tweet text
-                    if '] ' in tweet:
-                        tweet_text = tweet.split('] ', 1)[1].strip()
-                    else:
-                        tweet_text = tweet.strip()
+                    match = _ARCHIVE_TS_RE.match(tweet)
+                    tweet_text = tweet[match.end():].strip() if match else tweet
                     
-                    if tweet_text and tweet_text not in recent_tweets:
+                    if tweet_text and tweet_text not in seen_tweets:
                         recent_tweets.append(tweet_text)
+                        seen_tweets.add(tweet_text)
                         archived_count += 1
                 
                 logger.info(f"Loaded {archived_count} unique tweets from archive file")
@@ -164,68 +482,48 @@ def load_recently_posted_tweets(days=30):
             logger.info(f"Archive file {archive_file} doesn't exist yet - will be created when tweets are posted")
         
         # STEP 2: Load from recent daily history files
-        # Get date strings for the last N days
-        date_strings = []
-        for i in range(days):
-            date = (datetime.now() - timedelta(days=i)).strftime("%Y%m%d")
-            date_strings.append(date)
-        
         # Look for posted tweet history files from the last N days
         fallback_tweets = []
-        for date_str in date_strings:
-            history_file = os.path.join(TWEETS_DIR, f"{PLATFORM}_posted_{date_str}.json")
-            if os.path.exists(history_file):
-                logger.info(f"Found posted tweet history for {date_str}")
-                
-                # Find corresponding tweet files from that day
-                matching_tweet_files = [f for f in os.listdir(TWEETS_DIR) 
-                                       if f.startswith(f"{PLATFORM}_tweets_") 
-                                       and date_str in f 
-                                       and f.endswith(".txt")]
-                
-                for tweet_file in matching_tweet_files:
-                    file_path = os.path.join(TWEETS_DIR, tweet_file)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
-                        # Split by the separator (---) and filter out empty entries
-                        file_tweets = [tweet.strip() for tweet in content.split('---') if tweet.strip()]
-                        
-                        # Load the posted indices
-                        with open(history_file, 'r', encoding='utf-8') as f:
-                            posted_indices = json.load(f)
-                        
-                        # Add the tweets that were posted (if index is valid)
-                        for idx in posted_indices:
-                            if 0 <= idx < len(file_tweets):
-                                tweet_text = file_tweets[idx]
-                                if tweet_text and tweet_text not in recent_tweets and tweet_text not in fallback_tweets:
-                                    fallback_tweets.append(tweet_text)
-                                    daily_count += 1
-                    except Exception as e:
-                        logger.error(f"Error reading tweets from {tweet_file}: {e}")
+        for date_str in history_dates:
+            history_file = scan.history_files[date_str]
+            logger.info(f"Found posted tweet history for {date_str}")
+            
+            # Find corresponding tweet files from that day
+            matching_tweet_files = [f for f in tweet_files if date_str in f]
+            
+            for tweet_file in matching_tweet_files:
+                file_path = os.path.join(TWEETS_DIR, tweet_file)
+                try:
+                    content = file_reads[file_path].result()
+                    
+                    # Split by the separator (---) and filter out empty entries
+                    file_tweets = [tweet.strip() for tweet in content.split('---') if tweet.strip()]
+                    
+                    # Load the posted indices
+                    posted_indices = json.loads(file_reads[history_file].result())
+                    
+                    # Add the tweets that were posted (if index is valid)
+                    for idx in posted_indices:
+                        if 0 <= idx < len(file_tweets):
+                            tweet_text = file_tweets[idx]
+                            if tweet_text and tweet_text not in seen_tweets:
+                                fallback_tweets.append(tweet_text)
+                                seen_tweets.add(tweet_text)
+                                daily_count += 1
+                except Exception as e:
+                    logger.error(f"Error reading tweets from {tweet_file}: {e}")
         
         if daily_count > 0:
             logger.info(f"Loaded {daily_count} additional unique tweets from daily history files")
         
         # STEP 3: As a final safety check, load recent tweet files (last 5) to ensure we don't miss anything
         try:
-            # Get all tweet files for this platform
-            all_tweet_files = sorted([f for f in os.listdir(TWEETS_DIR) 
-                                if f.startswith(f"{PLATFORM}_tweets_") 
-                                and f.endswith(".txt")], reverse=True)
-            
-            # Use only the 5 most recent files
-            recent_files = all_tweet_files[:5]
-            
-            # Load tweets from these files
+            # Load tweets from the 5 most recent files
             additional_tweets = []
             for file in recent_files:
                 file_path = os.path.join(TWEETS_DIR, file)
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
+                    content = file_reads[file_path].result()
                     
                     # Split by the separator and filter out empty entries
                     if '---' in content:
@@ -235,8 +533,9 @@ def load_recently_posted_tweets(days=30):
                     
                     # Add unique tweets
                     for tweet in file_tweets:
-                        if tweet and tweet not in recent_tweets and tweet not in fallback_tweets and tweet not in additional_tweets:
+                        if tweet and tweet not in seen_tweets:
                             additional_tweets.append(tweet)
+                            seen_tweets.add(tweet)
                             file_count += 1
                 except Exception as e:
                     logger.error(f"Error reading tweets from {file}: {e}")
@@ -253,18 +552,37 @@ def load_recently_posted_tweets(days=30):
         logger.info(f"Total unique tweets loaded for similarity checking: {len(all_tweets)}")
         logger.info(f"Sources: Archive={archived_count}, Daily files={daily_count}, Recent files={file_count}")
         
-        return all_tweets
+        return RecentTweets(all_tweets)
         
     except Exception as e:
         logger.error(f"Error loading recent tweets: {e}")
-        return []
+        return RecentTweets()
+
+def similarity_ratio(a, b, cutoff=0.0):
+    """
+    Returns the similarity ratio (0.0-1.0) of two strings, or 0.0 if it is
+    below cutoff.
+    
+    Uses rapidfuzz's C++ implementation when available, which can stop early
+    once the cutoff is out of reach. Otherwise uses difflib, where
+    real_quick_ratio() and quick_ratio() are cheap upper bounds on ratio(),
+    so the expensive matching-block computation is skipped for pairs that
+    cannot reach the cutoff anyway.
+    """
+    if fuzz is not None:
+        return fuzz.ratio(a, b, score_cutoff=max(cutoff, 0.0) * 100) / 100.0
+    matcher = difflib.SequenceMatcher(None, a, b)
+    if cutoff > 0 and (matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff):
+        return 0.0
+    return matcher.ratio()
 
 def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
     """
     Checks if a tweet is too similar to any existing tweet.
     Returns True if similar, False otherwise.
     
-    Uses difflib's SequenceMatcher to calculate text similarity.
+    Uses similarity_ratio (rapidfuzz, or difflib's SequenceMatcher) to
+    calculate text similarity.
     
     Enhanced to detect duplicates by:
     1. Using word-based similarity checking (better for detecting paraphrased content)
@@ -275,94 +593,54 @@ def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
     if not existing_tweets:
         return False
     
-    # Normalize tweet for comparison (lowercase, remove URLs and hashtags)
-    def normalize_text(text):
-        # Extract just the tweet text if it has a timestamp
-        if '] ' in text:
-            text = text.split('] ', 1)[1]
-        # Remove URLs
-        text = re.sub(r'https?://\S+', '', text)
-        # Remove hashtags
-        text = re.sub(r'#\w+', '', text)
-        # Remove timestamps and random numbers that might be added
-        text = re.sub(r'\[\d{2}:\d{2}:\d{2}\]', '', text)
-        # Convert to lowercase and strip whitespace
-        return text.lower().strip()
-    
-    # Check if tweet contains a URL - treat it differently
-    has_url = bool(re.search(r'https?://\S+', tweet))
+    if not isinstance(existing_tweets, RecentTweets):
+        existing_tweets = RecentTweets(existing_tweets)
     
     # Extract the URL(s) from the tweet
-    urls = re.findall(r'https?://\S+', tweet) if has_url else []
+    urls = _URL_RE.findall(tweet)
     
     # Handle tweets with URLs specially
-    if has_url:
+    if urls:
         # For tweets with URLs, we want to avoid posting the same link with different text
-        # Extract the URL domain for comparison
-        domains = []
-        for url in urls:
-            try:
-                from urllib.parse import urlparse
-                domain = urlparse(url).netloc
-                if domain:
-                    domains.append(domain)
-            except Exception as e:
-                logger.error(f"Error parsing URL {url}: {e}")
+        # Extract the URL domain and path for comparison
+        url_parts = [(url,) + split_url(url) for url in urls]
+        domains = {domain for _, domain, _ in url_parts if domain}
         
-        # If we have domains, check for duplicates with the same domain
-        if domains:
-            # Look for existing tweets with the same domains
-            for existing in existing_tweets:
-                existing_urls = re.findall(r'https?://\S+', existing)
-                
-                for existing_url in existing_urls:
-                    try:
-                        from urllib.parse import urlparse
-                        existing_domain = urlparse(existing_url).netloc
-                        
-                        # If we found a matching domain
-                        if existing_domain in domains:
-                            # Now check if the path is similar too
-                            for url in urls:
-                                url_path = urlparse(url).path
-                                existing_path = urlparse(existing_url).path
-                                
-                                # If we're posting the same exact URL
-                                if url_path == existing_path:
-                                    logger.warning(f"Duplicate URL detected: {url}")
-                                    logger.warning(f"Existing: {existing_url}")
-                                    logger.warning(f"New: {url}")
-                                    return True
-                    except Exception as e:
-                        logger.error(f"Error comparing URLs: {e}")
-    
-    normalized_tweet = normalize_text(tweet)
+        # If we have domains, check for existing URLs with the same domain and path
+        for domain in domains:
+            for url, _, url_path in url_parts:
+                existing_url = existing_tweets.url_index.get((domain, url_path))
+                # If we're posting the same exact URL
+                if existing_url is not None:
+                    logger.warning(f"Duplicate URL detected: {url}")
+                    logger.warning(f"Existing: {existing_url}")
+                    logger.warning(f"New: {url}")
+                    return True
+    
+    # Extract first few words (first 5) for checking similar beginnings
+    new_entry = make_normalized_tweet(tweet)
+    normalized_tweet = new_entry.normalized
+    beginning_words = new_entry.beginning_words
+    beginning_phrase = new_entry.beginning
+    tweet_words = new_entry.word_set
+    tweet_length = len(normalized_tweet)
     
     # Skip very short tweets for similarity detection
     if len(normalized_tweet) < 20:
         return False
     
-    # Extract first few words for checking similar beginnings
-    words = normalized_tweet.split()
-    beginning_words = words[:5]  # Use first 5 words
-    beginning_phrase = ' '.join(beginning_words)
-    
-    for existing in existing_tweets:
-        normalized_existing = normalize_text(existing)
-        
-        # Skip comparison with very short existing tweets
-        if len(normalized_existing) < 20:
-            continue
+    # Very short existing tweets were already left out of the entries
+    for existing in existing_tweets.entries:
+        normalized_existing = existing.normalized
         
         # First check for similar beginnings (highly indicative of duplicate content)
-        existing_words = normalized_existing.split()
-        existing_beginning_words = existing_words[:5]
-        existing_beginning_phrase = ' '.join(existing_beginning_words)
+        existing_beginning_words = existing.beginning_words
+        existing_beginning_phrase = existing.beginning
         
         # If beginnings are very similar, apply a stricter similarity check
         beginning_similarity = 0
         if len(beginning_words) >= 3 and len(existing_beginning_words) >= 3:
-            beginning_similarity = difflib.SequenceMatcher(None, beginning_phrase, existing_beginning_phrase).ratio()
+            beginning_similarity = similarity_ratio(beginning_phrase, existing_beginning_phrase)
             
             # If first 5 words are extremely similar (> 0.9), highly likely to be duplicate content
             if beginning_similarity >= 0.9:
@@ -372,21 +650,15 @@ def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
                 return True
         
         # For full content comparison, do different comparisons
-        # 1. Full content similarity
-        full_similarity = difflib.SequenceMatcher(None, normalized_tweet, normalized_existing).ratio()
-        
-        # 2. Word-set similarity (Jaccard similarity - how many words are the same)
-        tweet_words = set(normalized_tweet.split())
-        existing_words = set(normalized_existing.split())
+        # 1. Word-set similarity (Jaccard similarity - how many words are the same)
+        # This is cheap, so do it before the full content comparison
+        existing_words = existing.word_set
         if tweet_words and existing_words:
-            intersection = tweet_words.intersection(existing_words)
-            union = tweet_words.union(existing_words)
-            word_similarity = len(intersection) / len(union) if union else 0
+            intersection_size = len(tweet_words & existing_words)
+            union_size = len(tweet_words) + len(existing_words) - intersection_size
+            word_similarity = intersection_size / union_size
         else:
             word_similarity = 0
-            
-        # Calculate combined score with more weight on beginning similarity
-        combined_score = (full_similarity * 0.5) + (beginning_similarity * 0.3) + (word_similarity * 0.2)
         
         # Adjust threshold based on how similar the beginnings are
         # More similar beginnings = lower threshold to detect duplicates
@@ -394,6 +666,22 @@ def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
         if beginning_similarity >= 0.7:
             # Lower the threshold the more similar the beginnings are
             adjusted_threshold = max(0.5, similarity_threshold - (beginning_similarity - 0.7))
+        
+        # 2. Full content similarity
+        # It only matters if it reaches 0.7 on its own or lifts the combined score
+        # up to the (adjusted or logging) threshold, so use that as the cutoff
+        needed_for_combined = (min(adjusted_threshold, 0.7) - (beginning_similarity * 0.3) - (word_similarity * 0.2)) / 0.5
+        full_cutoff = min(0.7, needed_for_combined)
+        # The ratio is at most 2*min(a, b)/(a + b), so tweets of very different
+        # lengths can be ruled out without calling similarity_ratio at all
+        existing_length = len(normalized_existing)
+        if 2.0 * min(tweet_length, existing_length) / (tweet_length + existing_length) < full_cutoff:
+            full_similarity = 0.0
+        else:
+            full_similarity = similarity_ratio(normalized_tweet, normalized_existing, full_cutoff)
+            
+        # Calculate combined score with more weight on beginning similarity
+        combined_score = (full_similarity * 0.5) + (beginning_similarity * 0.3) + (word_similarity * 0.2)
             
         # Determine if this is a duplicate based on our scores
         is_duplicate = False
@@ -440,17 +728,16 @@ def save_used_tweet_ids(tweet_ids, tweets=None):
     
     try:
         # Load existing history if it exists
-        existing_ids = []
+        combined = set()
         if os.path.exists(history_file):
-            with open(history_file, 'r', encoding='utf-8') as f:
-                existing_ids = json.load(f)
+            combined.update(load_json_file(history_file))
                 
         # Add new IDs
-        combined_ids = list(set(existing_ids + tweet_ids))
+        combined.update(tweet_ids)
         
-        # Save back to file
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(combined_ids, f)
+        # Save back to file, sorted so the file only changes when the IDs do
+        combined_ids = sorted(combined)
+        save_json_file(history_file, combined_ids)
             
         logger.info(f"Saved {len(combined_ids)} used tweet IDs to {history_file}")
         
@@ -465,139 +752,132 @@ def save_used_tweet_ids(tweet_ids, tweets=None):
             existing_archive_tweets = []
             try:
                 if os.path.exists(archive_file):
-                    with open(archive_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        existing_archive_tweets = [t.strip() for t in content.split('---') if t.strip()]
-                        logger.info(f"Loaded {len(existing_archive_tweets)} existing archived tweets")
+                    existing_archive_tweets = load_archive_entries(archive_file)
+                    logger.info(f"Loaded {len(existing_archive_tweets)} existing archived tweets")
             except Exception as e:
                 logger.error(f"Error reading existing archive: {e}")
             
-            # Normalize tweets for comparison
-            def normalize_text(text):
-                # Extract just the tweet text if it has a timestamp
-                if '] ' in text:
-                    text = text.split('] ', 1)[1]
-                # Remove URLs
-                text = re.sub(r'https?://\S+', '', text)
-                # Remove hashtags
-                text = re.sub(r'#\w+', '', text)
-                # Remove timestamps and random numbers
-                text = re.sub(r'\[\d{2}:\d{2}:\d{2}\]', '', text)
-                # Convert to lowercase and strip whitespace
-                return text.lower().strip()
-                
-            # Normalize existing archive tweets
-            normalized_existing = [normalize_text(t) for t in existing_archive_tweets]
+            # Normalize existing archive tweets, skipping very short ones, and
+            # keep them sorted by length so candidates can be found by bisection
+            normalized_existing = sorted(
+                (n for n in map(normalize_text, existing_archive_tweets) if len(n) >= 20),
+                key=len
+            )
+            existing_lengths = [len(n) for n in normalized_existing]
+            # Exact repeats are found with a set lookup before any similarity checks
+            normalized_existing_set = set(normalized_existing)
             
             # Archive new tweets that aren't already in the archive
-            new_archived = 0
-            with open(archive_file, 'a', encoding='utf-8') as f:
-                for tweet in tweets:
-                    # Check if this tweet is already in the archive
-                    normalized_tweet = normalize_text(tweet)
-                    
-                    # Skip very short tweets for comparison
-                    if len(normalized_tweet) < 20:
-                        # Just add it without checking
-                        archive_entry = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tweet}\n---\n"
-                        f.write(archive_entry)
-                        new_archived += 1
-                        continue
-                    
-                    # Check against existing archived tweets
-                    is_duplicate = False
-                    for existing in normalized_existing:
-                        # Skip very short existing tweets
-                        if len(existing) < 20:
-                            continue
-                            
-                        # Calculate similarity using sequence matcher
-                        import difflib
-                        similarity = difflib.SequenceMatcher(None, normalized_tweet, existing).ratio()
+            # Collect the new entries and append them to the archive in one write
+            new_entries = []
+            for tweet in tweets:
+                # Check if this tweet is already in the archive
+                normalized_tweet = normalize_text(tweet)
+                
+                # Skip very short tweets for comparison
+                if len(normalized_tweet) < 20:
+                    # Just add it without checking
+                    archive_entry = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tweet}\n---\n"
+                    new_entries.append(archive_entry)
+                    continue
+                
+                # Check against existing archived tweets
+                # The ratio is at most 2*min(a, b)/(a + b), so only tweets with
+                # 9*a <= 11*b and 9*b <= 11*a in length can reach 0.9
+                length = len(normalized_tweet)
+                lo = bisect.bisect_left(existing_lengths, -(-9 * length // 11))
+                hi = bisect.bisect_right(existing_lengths, 11 * length // 9)
+                duplicate_of = None
+                similarity = 0.0
+                if normalized_tweet in normalized_existing_set:
+                    duplicate_of, similarity = normalized_tweet, 1.0
+                elif process is not None:
+                    # Let rapidfuzz scan the whole archive in compiled code
+                    match = process.extractOne(normalized_tweet, normalized_existing[lo:hi], scorer=fuzz.ratio, score_cutoff=90)
+                    if match:
+                        duplicate_of, similarity = match[0], match[1] / 100.0
+                else:
+                    for existing in normalized_existing[lo:hi]:
+                        # Calculate similarity, only the 0.9 duplicate cutoff matters here
+                        similarity = similarity_ratio(normalized_tweet, existing, 0.9)
                         
                         # If similarity is too high, consider it a duplicate
                         if similarity >= 0.9:
-                            logger.warning(f"Tweet already in archive (similarity: {similarity:.2f})")
-                            logger.warning(f"New: {normalized_tweet[:40]}...")
-                            logger.warning(f"Existing: {existing[:40]}...")
-                            is_duplicate = True
+                            duplicate_of = existing
                             break
-                    
-                    # If not a duplicate, add to archive
-                    if not is_duplicate:
-                        archive_entry = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tweet}\n---\n"
-                        f.write(archive_entry)
-                        new_archived += 1
-                        # Also add to our in-memory list for checking remaining tweets
-                        normalized_existing.append(normalized_tweet)
-                    else:
-                        logger.warning(f"Skipping duplicate tweet in archive")
-                    
+                
+                is_duplicate = duplicate_of is not None
+                if is_duplicate:
+                    logger.warning(f"Tweet already in archive (similarity: {similarity:.2f})")
+                    logger.warning(f"New: {normalized_tweet[:40]}...")
+                    logger.warning(f"Existing: {duplicate_of[:40]}...")
+                
+                # If not a duplicate, add to archive
+                if not is_duplicate:
+                    archive_entry = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tweet}\n---\n"
+                    new_entries.append(archive_entry)
+                    # Also add to our in-memory list for checking remaining tweets
+                    position = bisect.bisect_right(existing_lengths, length)
+                    existing_lengths.insert(position, length)
+                    normalized_existing.insert(position, normalized_tweet)
+                    normalized_existing_set.add(normalized_tweet)
+                else:
+                    logger.warning(f"Skipping duplicate tweet in archive")
+            
+            if new_entries:
+                with open(archive_file, 'a', encoding='utf-8') as f:
+                    f.writelines(new_entries)
+            new_archived = len(new_entries)
+            
             logger.info(f"Archived {new_archived} new unique tweet texts to {archive_file}")
         
     except Exception as e:
         logger.error(f"Error saving used tweet IDs: {e}")
 
-def post_to_twitter(tweet_text):
+def truncate_tweet(tweet_text, limit=TWITTER_CHAR_LIMIT):
     """
-    Posts a tweet to Twitter/X using the v2 API, which works with the free tier.
-    Returns True if successful, False otherwise.
+    Shortens a tweet to the character limit.
     
-    The tweet text will have its URLs shortened automatically if URL shortening is enabled.
+    The text is cut at the last space before the limit and an ellipsis is
+    added. If the first URL would be cut off, it is added back after the
+    ellipsis. Tweets within the limit are returned unchanged.
     """
-    # Shorten URLs in the tweet text to save characters
-    tweet_text = shorten_urls_in_text(tweet_text)
-    # Debug logging for environment variable content
-    logger.info("======== TWITTER API CREDENTIALS DIAGNOSTICS ========")
-    logger.info(f"OS Environment Variables:")
-    import os
-    env_vars = {k: v for k, v in os.environ.items() if k.startswith('X_')}
-    logger.info(f"Found {len(env_vars)} Twitter-related environment variables")
-    
-    # Log credential availability (securely)
-    logger.info(f"Twitter API credentials check:")
-    logger.info(f"  X_API_KEY: {'✅ Present' if X_API_KEY else '❌ Missing'}")
-    logger.info(f"  X_API_SECRET: {'✅ Present' if X_API_SECRET else '❌ Missing'}")
-    logger.info(f"  X_ACCESS_TOKEN: {'✅ Present' if X_ACCESS_TOKEN else '❌ Missing'}")
-    logger.info(f"  X_ACCESS_SECRET: {'✅ Present' if X_ACCESS_SECRET else '❌ Missing'}")
-    logger.info(f"  X_BEARER_TOKEN: {'✅ Present' if X_BEARER_TOKEN else '❌ Missing'}")
+    if len(tweet_text) <= limit:
+        return tweet_text
     
-    if not all([X_API_KEY, X_API_SECRET, X_ACCESS_TOKEN, X_ACCESS_SECRET]):
-        logger.error("Missing Twitter API credentials. Skipping.")
-        return False
+    # Find the last space before the limit to avoid cutting words
+    cutoff_point = tweet_text.rfind(' ', 0, limit - 4)
+    if cutoff_point == -1:  # No space found
+        cutoff_point = limit - 4
+    truncated = tweet_text[:cutoff_point] + "..."
     
-    try:
-        # Log partial keys (safely) to verify correct credentials are being used
-        logger.info(f"Using API key ending in: ...{X_API_KEY[-4:] if len(X_API_KEY) > 4 else 'too short'}")
-        logger.info(f"Using access token ending in: ...{X_ACCESS_TOKEN[-4:] if len(X_ACCESS_TOKEN) > 4 else 'too short'}")
-        
-        # Check for non-ASCII characters that might cause issues
-        import unicodedata
-        for var_name, var_value in {
-            'X_API_KEY': X_API_KEY,
-            'X_API_SECRET': X_API_SECRET,
-            'X_ACCESS_TOKEN': X_ACCESS_TOKEN,
-            'X_ACCESS_SECRET': X_ACCESS_SECRET
-        }.items():
-            if var_value:
-                # Check for invisible characters
-                has_invisible = any(c.isspace() and c != ' ' for c in var_value)
-                has_non_ascii = any(ord(c) > 127 for c in var_value)
-                if has_invisible or has_non_ascii:
-                    logger.warning(f"{var_name} contains invisible or non-ASCII characters")
-                    logger.warning(f"Character breakdown: {[(c, ord(c)) for c in var_value]}")
-        
-        # First verify credentials to check if they're valid
-        logger.info("Verifying Twitter credentials...")
-        
-        # Authenticate with Twitter using v2 Client
-        client = tweepy.Client(
+    # Preserve the first URL if it's after the cutoff point (and not too long)
+    url_match = _URL_RE.search(tweet_text)
+    if url_match and len(url_match.group()) < limit - 5 and url_match.start() > cutoff_point:
+        truncated += " " + url_match.group()
+    return truncated
+
+def get_twitter_client():
+    """
+    Returns the shared tweepy v2 Client, creating it on first use.
+    
+    The credentials are verified with get_me() until that succeeds once,
+    so later posts in the same run don't spend an API call on it.
+    """
+    global _twitter_client, _twitter_client_verified
+    
+    if _twitter_client is None:
+        _twitter_client = tweepy.Client(
             consumer_key=X_API_KEY,
             consumer_secret=X_API_SECRET,
             access_token=X_ACCESS_TOKEN,
             access_token_secret=X_ACCESS_SECRET
         )
-        
+    client = _twitter_client
+    
+    if not _twitter_client_verified:
+        # First verify credentials to check if they're valid
+        logger.info("Verifying Twitter credentials...")
         try:
             # Try to get the authenticated user to verify credentials
             logger.info("Attempting to verify credentials with get_me()...")
@@ -605,6 +885,7 @@ def post_to_twitter(tweet_text):
             if me and hasattr(me, 'data') and me.data:
                 username = me.data.username
                 logger.info(f"✅ Successfully authenticated as @{username}")
+                _twitter_client_verified = True
             else:
                 logger.warning("⚠️ Authentication response format unexpected")
                 logger.warning(f"Response type: {type(me)}")
@@ -623,38 +904,65 @@ def post_to_twitter(tweet_text):
                 logger.error(f"User lookup also failed: {lookup_e}")
             
             # Continue anyway to try posting
+    
+    return client
+
+def record_rate_limit_reset(error):
+    """
+    Remembers when X's rate limit resets, from the x-rate-limit-reset header
+    of a TooManyRequests error, so the next attempt can wait exactly that long.
+    """
+    global _rate_limit_reset
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        _rate_limit_reset = int(headers['x-rate-limit-reset'])
+    except (KeyError, TypeError, ValueError):
+        _rate_limit_reset = None
+
+def post_to_twitter(tweet_text):
+    """
+    Posts a tweet to Twitter/X using the v2 API, which works with the free tier.
+    Returns True if successful, False otherwise.
+    
+    The tweet text will have its URLs shortened automatically if URL shortening is enabled.
+    """
+    global _rate_limit_reset
+    _rate_limit_reset = None
+    
+    # Shorten URLs in the tweet text to save characters
+    tweet_text = shorten_urls_in_text(tweet_text)
+    # Credential diagnostics are only gathered when debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("======== TWITTER API CREDENTIALS DIAGNOSTICS ========")
+        env_var_count = sum(1 for k in os.environ if k.startswith('X_'))
+        logger.debug(f"Found {env_var_count} Twitter-related environment variables")
+        
+        # Log credential availability (securely)
+        logger.debug(f"Twitter API credentials check:")
+        logger.debug(f"  X_API_KEY: {'✅ Present' if X_API_KEY else '❌ Missing'}")
+        logger.debug(f"  X_API_SECRET: {'✅ Present' if X_API_SECRET else '❌ Missing'}")
+        logger.debug(f"  X_ACCESS_TOKEN: {'✅ Present' if X_ACCESS_TOKEN else '❌ Missing'}")
+        logger.debug(f"  X_ACCESS_SECRET: {'✅ Present' if X_ACCESS_SECRET else '❌ Missing'}")
+        logger.debug(f"  X_BEARER_TOKEN: {'✅ Present' if X_BEARER_TOKEN else '❌ Missing'}")
+    
+    if not all([X_API_KEY, X_API_SECRET, X_ACCESS_TOKEN, X_ACCESS_SECRET]):
+        logger.error("Missing Twitter API credentials. Skipping.")
+        return False
+    
+    try:
+        if logger.isEnabledFor(logging.DEBUG):
+            # Log partial keys (safely) to verify correct credentials are being used
+            logger.debug(f"Using API key ending in: ...{X_API_KEY[-4:] if len(X_API_KEY) > 4 else 'too short'}")
+            logger.debug(f"Using access token ending in: ...{X_ACCESS_TOKEN[-4:] if len(X_ACCESS_TOKEN) > 4 else 'too short'}")
+        
+        # Authenticate with Twitter using the shared v2 Client
+        client = get_twitter_client()
         
         # Ensure tweet is within Twitter's character limit (280)
-        TWITTER_CHAR_LIMIT = 280
         if len(tweet_text) > TWITTER_CHAR_LIMIT:
             logger.warning(f"Tweet exceeds Twitter's 280 character limit ({len(tweet_text)} chars). Truncating.")
-            
-            # Find URLs in the tweet text
-            import re
-            url_pattern = r'https?://\S+'
-            urls = re.findall(url_pattern, tweet_text)
-            
-            # If we have URLs, preserve the first one
-            if urls and len(urls[0]) < TWITTER_CHAR_LIMIT - 5:
-                # Find the last space before the limit to avoid cutting words
-                cutoff_point = tweet_text[:TWITTER_CHAR_LIMIT - 4].rfind(' ')
-                if cutoff_point == -1:  # No space found
-                    cutoff_point = TWITTER_CHAR_LIMIT - 4
-                
-                # Preserve the URL if it's after the cutoff point
-                url_pos = tweet_text.find(urls[0])
-                if url_pos > cutoff_point:
-                    # Truncate, add ellipsis, then add the URL
-                    tweet_text = tweet_text[:cutoff_point] + "... " + urls[0]
-                else:
-                    # URL is already in the truncated part
-                    tweet_text = tweet_text[:cutoff_point] + "..."
-            else:
-                # No URLs or URL too long, just truncate
-                cutoff_point = tweet_text[:TWITTER_CHAR_LIMIT - 4].rfind(' ')
-                if cutoff_point == -1:
-                    cutoff_point = TWITTER_CHAR_LIMIT - 4
-                tweet_text = tweet_text[:cutoff_point] + "..."
+            tweet_text = truncate_tweet(tweet_text)
             
             logger.info(f"Truncated tweet for Twitter: {tweet_text}")
         
@@ -695,6 +1003,7 @@ def post_to_twitter(tweet_text):
                     logger.error(f"Failed to post modified tweet: {retry_e}")
             # Special handling for rate limiting
             if isinstance(tweet_e, tweepy.errors.TooManyRequests):
+                record_rate_limit_reset(tweet_e)
                 logger.error("You've hit Twitter's rate limit. You need to wait before posting more tweets.")
                 logger.error("Consider reducing the posting frequency or number of tweets per session.")
                 logger.error("Twitter's rate limits for posting are typically 300 tweets per 3 hour window.")
@@ -710,6 +1019,7 @@ def post_to_twitter(tweet_text):
         logger.error("This usually means your app doesn't have write permissions")
         return False
     except tweepy.errors.TooManyRequests as e:
+        record_rate_limit_reset(e)
         logger.error(f"❌ Twitter rate limit exceeded: {e}")
         logger.error("You need to wait before posting more tweets. Consider reducing frequency.")
         return False
@@ -738,15 +1048,13 @@ def get_used_tweet_indices():
     used_indices = []
     if os.path.exists(history_file):
         try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                used_indices = json.load(f)
+            used_indices = load_json_file(history_file)
                 
             # If we have used more than 50 tweets today, it's likely an error - reset the counter
             # This prevents the system from getting stuck in a state where it thinks all tweets are used
             if len(used_indices) > 50:
                 logger.warning(f"Found {len(used_indices)} used indices, which seems excessive. Resetting to empty.")
-                with open(history_file, 'w', encoding='utf-8') as f:
-                    json.dump([], f)
+                save_json_file(history_file, [])
                 return []
                 
         except Exception as e:
@@ -754,6 +1062,35 @@ def get_used_tweet_indices():
     
     return used_indices
 
+def get_url_cache():
+    """
+    Returns the long URL -> short URL cache, loading it from disk on first use
+    and registering a save at exit.
+    """
+    global _url_cache
+    if _url_cache is None:
+        _url_cache = {}
+        if os.path.exists(URL_CACHE_FILE):
+            try:
+                _url_cache = load_json_file(URL_CACHE_FILE)
+            except Exception as e:
+                logger.warning(f"Could not load URL cache, starting empty: {e}")
+        atexit.register(save_url_cache)
+    return _url_cache
+
+def save_url_cache():
+    """
+    Writes the URL cache back to disk if any new URL was shortened this run.
+    """
+    global _url_cache_dirty
+    if not _url_cache_dirty:
+        return
+    try:
+        save_json_file(URL_CACHE_FILE, _url_cache)
+        _url_cache_dirty = False
+    except Exception as e:
+        logger.error(f"Error saving URL cache: {e}")
+
 def shorten_url(long_url):
     """
     Shortens a URL using a free URL shortening service.
@@ -771,6 +1108,11 @@ def shorten_url(long_url):
     # Code below is temporarily disabled until URL shortening issues are resolved
     if not USE_URL_SHORTENER:
         return long_url
+    
+    global _url_cache_dirty
+    url_cache = get_url_cache()
+    if long_url in url_cache:
+        return url_cache[long_url]
         
     try:
         # URL encode the long URL to handle special characters
@@ -779,7 +1121,7 @@ def shorten_url(long_url):
         
         # Try using TinyURL's simple API
         tinyurl_api = f"https://tinyurl.com/api-create.php?url={encoded_url}"
-        response = requests.get(tinyurl_api, timeout=10)
+        response = _http_session.get(tinyurl_api, timeout=10)
         
         if response.status_code == 200 and response.text and response.text.startswith('https://'):
             short_url = response.text.strip()
@@ -787,10 +1129,12 @@ def shorten_url(long_url):
             
             # Verify the shortened URL by testing the redirect
             try:
-                verify_response = requests.head(short_url, timeout=5, allow_redirects=False)
+                verify_response = _http_session.head(short_url, timeout=5, allow_redirects=False)
                 if verify_response.status_code in (301, 302) and 'location' in verify_response.headers:
                     redirect_url = verify_response.headers['location']
                     logger.info(f"Verified redirect: {short_url} → {redirect_url}")
+                    url_cache[long_url] = short_url
+                    _url_cache_dirty = True
                     return short_url
                 else:
                     logger.warning(f"Shortened URL failed verification check: {short_url}")
@@ -822,8 +1166,7 @@ def shorten_urls_in_text(text):
         
     try:
         # Find URLs in the text
-        url_pattern = r'https?://\S+'
-        urls = re.findall(url_pattern, text)
+        urls = _URL_RE.findall(text)
         
         if not urls:
             return text
@@ -847,18 +1190,114 @@ def is_elon_musk_tweet(tweet_text):
     Checks if a tweet contains references to Elon Musk.
     Returns True if tweet mentions Elon Musk, False otherwise.
     """
-    # Convert to lowercase for case-insensitive matching
-    tweet_lower = tweet_text.lower()
+    # One case-insensitive pass over the text instead of a scan per keyword
+    match = _ELON_RE.search(tweet_text)
+    if match:
+        logger.info(f"Tweet contains Elon Musk reference: '{match.group(0).lower()}'")
+        return True
+    
+    return False
+
+def char_ngrams(text, min_n=3, max_n=5):
+    """
+    Returns the character n-grams of every word in the text, padded with a
+    space on each side. This matches scikit-learn's 'char_wb' analyzer:
+    a word shorter than n characters becomes a single n-gram.
+    """
+    ngrams = []
+    for word in text.split():
+        word = f" {word} "
+        length = len(word)
+        for n in range(min_n, max_n + 1):
+            if length <= n:
+                ngrams.append(word)
+                break
+            ngrams.extend(word[i:i + n] for i in range(length - n + 1))
+    return ngrams
+
+def tweet_hash(text):
+    """
+    Returns a stable hash of a tweet's text for use as a cache key.
+    """
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def load_duplicate_check_cache(fingerprint, similarity_threshold):
+    """
+    Loads the cached duplicate verdicts (tweet hash -> is duplicate).
+    Returns an empty dict unless they were computed against the same
+    recent tweets and similarity threshold.
+    """
+    try:
+        if os.path.exists(DUPLICATE_CHECK_CACHE_FILE):
+            cache = load_json_file(DUPLICATE_CHECK_CACHE_FILE)
+            if cache.get('fingerprint') == fingerprint and cache.get('threshold') == similarity_threshold:
+                return cache.get('verdicts', {})
+    except Exception as e:
+        logger.warning(f"Error loading duplicate check cache: {e}")
+    return {}
+
+def save_duplicate_check_cache(fingerprint, similarity_threshold, verdicts):
+    """
+    Saves duplicate verdicts for the given recent tweets and threshold.
+    """
+    cache = {'fingerprint': fingerprint, 'threshold': similarity_threshold, 'verdicts': verdicts}
+    try:
+        save_json_file(DUPLICATE_CHECK_CACHE_FILE, cache)
+    except Exception as e:
+        logger.warning(f"Error saving duplicate check cache: {e}")
+
+def compute_uniqueness_scores(texts):
+    """
+    Scores how unique each tweet is compared to the other tweets (0.0-1.0).
     
-    # Check for various ways to mention Elon Musk
-    elon_keywords = ['elon', 'musk', 'elon musk']
+    A tweet's score is 1 minus its average TF-IDF cosine similarity to every
+    other tweet, over the 3-5 character n-grams of its words with URLs and
+    hashtags removed. Character n-grams pick up shared substrings much like
+    SequenceMatcher did. The sum of a tweet's similarities is its dot
+    product with the sum of all tweet vectors minus itself, so no pairwise
+    similarity matrix is needed.
+    Without numpy, falls back to the average difflib similarity of every pair.
+    """
+    n = len(texts)
+    if n < 2:
+        return [1.0] * n
     
-    for keyword in elon_keywords:
-        if keyword in tweet_lower:
-            logger.info(f"Tweet contains Elon Musk reference: '{keyword}'")
-            return True
+    normalized = [_HASH_RE.sub('', _URL_RE.sub('', text)).lower().strip() for text in texts]
     
-    return False
+    if np is None:
+        scores = []
+        for i, tweet in enumerate(normalized):
+            total_similarity = 0
+            for j, other in enumerate(normalized):
+                if i != j:
+                    total_similarity += difflib.SequenceMatcher(None, tweet, other).ratio()
+            scores.append(1 - total_similarity / (n - 1))
+        return scores
+    
+    # Sparse n-gram counts as parallel (row, term, count) arrays
+    vocabulary = {}
+    rows, terms, counts = [], [], []
+    for row, text in enumerate(normalized):
+        for term, term_count in Counter(char_ngrams(text)).items():
+            rows.append(row)
+            terms.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(term_count)
+    if not vocabulary:
+        return [1.0] * n
+    rows = np.array(rows)
+    terms = np.array(terms)
+    
+    # Smoothed IDF weights, then L2-normalize every tweet vector
+    document_frequency = np.bincount(terms, minlength=len(vocabulary))
+    idf = np.log((1 + n) / (1 + document_frequency)) + 1
+    values = np.array(counts, dtype=float) * idf[terms]
+    values /= np.sqrt(np.bincount(rows, weights=values * values, minlength=n))[rows]
+    
+    # Similarity of each tweet to all the others
+    total_vector = np.bincount(terms, weights=values, minlength=len(vocabulary))
+    similarity_sums = (np.bincount(rows, weights=values * total_vector[terms], minlength=n)
+                       - np.bincount(rows, weights=values * values, minlength=n))
+    return (1 - similarity_sums / (n - 1)).tolist()
 
 def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
     """
@@ -913,14 +1352,19 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
         logger.info(f"Creating empty archive file at {archive_file}")
         try:
             with open(archive_file, 'w', encoding='utf-8') as f:
-                f.write("# Archive of all posted tweets for similarity detection\n")
-                f.write("# Format: [timestamp] tweet text\n")
-                f.write("# Separator: ---\n\n")
+                f.writelines([
+                    "# Archive of all posted tweets for similarity detection\n",
+                    "# Format: [timestamp] tweet text\n",
+                    "# Separator: ---\n\n",
+                ])
         except Exception as e:
             logger.error(f"Failed to create archive file {archive_file}: {e}")
     
+    # Scan the tweets directory once for both loaders below
+    scan = scan_tweet_dir()
+    
     # Load tweets
-    tweets = load_tweets()
+    tweets = load_tweets(scan)
     if not tweets:
         logger.warning(f"No tweets available. Exiting.")
         return
@@ -933,8 +1377,13 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
     logger.info(f"Using similarity threshold: {similarity_threshold} (higher = more similar tweets allowed)")
     
     # Load ALL previously posted tweets for thorough similarity checking
-    recent_tweets = load_recently_posted_tweets(days=30)
-    logger.info(f"Loaded {len(recent_tweets)} tweets for similarity checking")
+    # FORCE mode bypasses every duplicate check, so the history is not needed then
+    if force:
+        recent_tweets = RecentTweets([])
+        logger.info("FORCE mode enabled - skipping load of previously posted tweets")
+    else:
+        recent_tweets = load_recently_posted_tweets(days=30, scan=scan)
+        logger.info(f"Loaded {len(recent_tweets)} tweets for similarity checking")
     
     # Check if we need to reset the used indices - if most tweets are marked as used
     if len(used_indices) > 0 and len(used_indices) >= len(tweets) * 0.8:
@@ -943,11 +1392,11 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
         # Reset the history file
         timestamp = datetime.now().strftime("%Y%m%d")
         history_file = os.path.join(TWEETS_DIR, f"{PLATFORM}_posted_{timestamp}.json")
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump([], f)
+        save_json_file(history_file, [])
     
     # Get available indices (not used today)
-    available_indices = [i for i in range(len(tweets)) if i not in used_indices]
+    used_set = set(used_indices)
+    available_indices = [i for i in range(len(tweets)) if i not in used_set]
     logger.info(f"Found {len(available_indices)} available tweets to post")
     
     if not available_indices:
@@ -961,6 +1410,12 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
     
     logger.info(f"Performing content-based duplicate check on {len(available_indices)} available tweets...")
     
+    # Reuse verdicts from the last run if the recent tweets haven't changed since
+    if not force:
+        recent_fingerprint = recent_tweets.fingerprint()
+        cached_verdicts = load_duplicate_check_cache(recent_fingerprint, similarity_threshold)
+        verdicts = {}
+    
     for idx in available_indices:
         tweet = tweets[idx]
         
@@ -979,7 +1434,13 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
             continue
         
         # Check duplicate by content
-        if is_similar_to_existing(tweet, recent_tweets, similarity_threshold):
+        key = tweet_hash(tweet)
+        is_similar = cached_verdicts.get(key)
+        if is_similar is None:
+            is_similar = is_similar_to_existing(tweet, recent_tweets, similarity_threshold)
+        verdicts[key] = is_similar
+        
+        if is_similar:
             logger.warning(f"Tweet #{idx} content matches an existing tweet. Marking as duplicate.")
             duplicate_count += 1
             is_duplicate = True
@@ -987,6 +1448,12 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
         if not is_duplicate:
             double_checked_indices.append(idx)
     
+    if not force and verdicts != cached_verdicts:
+        save_duplicate_check_cache(recent_fingerprint, similarity_threshold, verdicts)
+    
+    # Size of the recent tweet pool the tweets above were checked against
+    checked_recent_count = len(recent_tweets)
+    
     logger.info(f"Content duplicate check found {duplicate_count} duplicates, {len(double_checked_indices)} tweets passed")
     
     # Now use the double-checked indices instead of the original available indices
@@ -1000,51 +1467,19 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
     logger.info("Ranking tweets by uniqueness score...")
     tweet_uniqueness_scores = []
     
-    for idx in available_indices:
-        tweet = tweets[idx]
-        # Calculate uniqueness by comparing this tweet to all other available tweets
-        total_similarity = 0
-        comparisons = 0
-        
-        for other_idx in available_indices:
-            if idx == other_idx:
-                continue
-                
-            other_tweet = tweets[other_idx]
-            # Use difflib to measure similarity
-            import difflib
-            
-            # Normalize for comparison
-            def normalize_text(text):
-                text = re.sub(r'https?://\S+', '', text)
-                text = re.sub(r'#\w+', '', text)
-                return text.lower().strip()
-            
-            normalized_tweet = normalize_text(tweet)
-            normalized_other = normalize_text(other_tweet)
-            
-            # Calculate similarity
-            similarity = difflib.SequenceMatcher(None, normalized_tweet, normalized_other).ratio()
-            total_similarity += similarity
-            comparisons += 1
-        
-        # Calculate average similarity, then convert to uniqueness score
-        avg_similarity = total_similarity / max(comparisons, 1)
-        uniqueness_score = 1 - avg_similarity
-        
-        tweet_uniqueness_scores.append((idx, uniqueness_score, tweet))
+    uniqueness_scores = compute_uniqueness_scores([tweets[idx] for idx in available_indices])
+    for idx, uniqueness_score in zip(available_indices, uniqueness_scores):
+        tweet_uniqueness_scores.append((idx, uniqueness_score, tweets[idx]))
         logger.info(f"Tweet #{idx} uniqueness score: {uniqueness_score:.2f}")
     
-    # Sort by uniqueness score (highest first)
-    tweet_uniqueness_scores.sort(key=lambda x: x[1], reverse=True)
-    
-    # Choose the most unique tweets up to the requested count
+    # Choose the most unique tweets (highest score first) up to the requested count
     num_to_post = min(count, len(tweet_uniqueness_scores))
-    indices_to_post = [idx for idx, _, _ in tweet_uniqueness_scores[:num_to_post]]
+    top_scores = nlargest(num_to_post, tweet_uniqueness_scores, key=lambda x: x[1])
+    indices_to_post = [idx for idx, _, _ in top_scores]
     
     # Log the selected tweets with their uniqueness scores
     logger.info("Selected tweets by uniqueness ranking:")
-    for i, (idx, score, tweet_text) in enumerate(tweet_uniqueness_scores[:num_to_post]):
+    for i, (idx, score, tweet_text) in enumerate(top_scores):
         logger.info(f"  {i+1}. Tweet #{idx} (score: {score:.2f}): {tweet_text[:50]}...")
     logger.info(f"Selected {len(indices_to_post)} tweets to post")
     
@@ -1052,12 +1487,19 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
     skipped_indices = []
     final_indices_to_post = []
     
-    logger.info("Performing final duplicate check before posting...")
+    # Every selected tweet already passed the check against the first checked_recent_count
+    # recent tweets, so only tweets added to the pool since then need checking
+    new_recent_tweets = RecentTweets(recent_tweets.tweets[checked_recent_count:])
+    if new_recent_tweets:
+        logger.info("Performing final duplicate check before posting...")
+    else:
+        logger.info("No tweets added since the duplicate check, skipping final check")
+    
     for idx in indices_to_post:
         tweet = tweets[idx]
         
         # One last check against recent tweets to be safe
-        if not force and is_similar_to_existing(tweet, recent_tweets, similarity_threshold):
+        if not force and new_recent_tweets and is_similar_to_existing(tweet, new_recent_tweets, similarity_threshold):
             logger.warning(f"Final check: Tweet #{idx} still seems to be a duplicate. Skipping.")
             skipped_indices.append(idx)
             continue
@@ -1073,11 +1515,18 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
         
     # Post each tweet
     platform_posted = []
-    posted_tweet_texts = []
 
     # Use a longer wait time between posts to avoid rate limits
+    # Waits are scheduled as a deadline, so the work done after a post counts towards them
+    next_post_time = 0
     for i, idx in enumerate(final_indices_to_post):
         tweet = tweets[idx]
+        
+        # Wait for whatever remains of the delay after the previous post
+        delay = next_post_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        
         logger.info(f"Posting tweet #{idx}: {tweet[:50]}...")
         
         # Post to Twitter
@@ -1086,9 +1535,11 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
         if success:
             platform_posted.append(idx)
             posted_indices.append(idx)
-            posted_tweet_texts.append(tweet)
             logger.info(f"Successfully posted tweet #{idx}")
             
+            # Save right away, so a crash later in the batch cannot repost this tweet
+            save_used_tweet_ids(used_indices + platform_posted, [tweet])
+            
             # Add tweet to in-memory list of recent tweets to prevent posting duplicates in same batch
             recent_tweets.append(tweet)
             
@@ -1096,20 +1547,23 @@ def main(count=1, similarity_threshold=0.7, force=False, wait_time=60):
             # Only add delay if this isn't the last tweet
             if i < len(final_indices_to_post) - 1:
                 logger.info(f"Waiting {wait_time} seconds before next post to avoid rate limits...")
-                time.sleep(wait_time)
+                next_post_time = time.monotonic() + wait_time
         else:
             logger.error(f"Failed to post tweet #{idx}")
             
             # If we hit a rate limit, wait longer before the next attempt
             if i < len(final_indices_to_post) - 1:
-                extended_wait = wait_time * 2
-                logger.info(f"Post failed, waiting {extended_wait} seconds before next attempt...")
-                time.sleep(extended_wait)
+                if _rate_limit_reset is not None:
+                    # X said when the limit resets, so wait exactly until then
+                    extended_wait = max(1, _rate_limit_reset - time.time())
+                    logger.info(f"Rate limited, waiting {extended_wait:.0f} seconds until the limit resets...")
+                else:
+                    extended_wait = wait_time * 2
+                    logger.info(f"Post failed, waiting {extended_wait} seconds before next attempt...")
+                next_post_time = time.monotonic() + extended_wait
     
-    # Save posted indices and tweet texts
+    # Posted indices and tweet texts were saved after each post
     if platform_posted:
-        logger.info(f"Saving {len(platform_posted)} used tweet IDs")
-        save_used_tweet_ids(used_indices + platform_posted, posted_tweet_texts)
         logger.info(f"✅ Posted {len(platform_posted)} tweets successfully")
     else:
         logger.warning(f"❌ No tweets were successfully posted")
@@ -5,16 +5,27 @@ import re
 import time
 import json
 import random
-import tweepy
 import logging
 import argparse
 import difflib
-import requests
+import bisect
+from collections import namedtuple
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
-# Updated to work with atproto 0.0.61
-from atproto import Client as AtprotoClient
 from pathlib import Path
 
+# rapidfuzz is optional; fall back to difflib when it is not installed
+try:
+    from rapidfuzz import fuzz
+except ImportError:
+    fuzz = None
+
+# orjson is optional; fall back to the json module when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Try to import metrics tracker
 try:
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -70,6 +81,32 @@ X_BEARER_TOKEN = os.environ.get('X_BEARER_TOKEN')
 BLUESKY_USERNAME = os.environ.get('BLUESKY_USERNAME')
 BLUESKY_PASSWORD = os.environ.get('BLUESKY_PASSWORD')
 
+def find_suspicious_credentials():
+    """
+    Returns the names of the Twitter API credentials that contain invisible
+    or non-ASCII characters, which usually means they were pasted with extra
+    characters and will fail to authenticate.
+    """
+    suspicious = []
+    for var_name, var_value in {
+        'X_API_KEY': X_API_KEY,
+        'X_API_SECRET': X_API_SECRET,
+        'X_ACCESS_TOKEN': X_ACCESS_TOKEN,
+        'X_ACCESS_SECRET': X_ACCESS_SECRET
+    }.items():
+        if var_value:
+            # Check for invisible characters
+            has_invisible = any(c.isspace() and c != ' ' for c in var_value)
+            has_non_ascii = not var_value.isascii()
+            if has_invisible or has_non_ascii:
+                suspicious.append(var_name)
+    return suspicious
+
+# The credentials can't change while the script runs, so check them once at startup
+SUSPICIOUS_CREDENTIALS = find_suspicious_credentials()
+for var_name in SUSPICIOUS_CREDENTIALS:
+    logger.warning(f"{var_name} contains invisible or non-ASCII characters")
+
 # Define the tweets directory
 TWEETS_DIR = os.path.join(os.path.dirname(__file__), '../tweets')
 
@@ -78,10 +115,251 @@ TWEETS_DIR = os.path.join(os.path.dirname(__file__), '../tweets')
 global USE_URL_SHORTENER
 USE_URL_SHORTENER = True
 
-def load_tweets(platform="x"):
+# The platform SDKs are only imported when posting to that platform,
+# see load_tweepy and load_atproto_client
+tweepy = None
+AtprotoClient = None
+
+# Shared API clients for the run, see get_twitter_client and get_bluesky_client
+_twitter_client = None
+_twitter_client_verified = False
+_bluesky_client = None
+
+# Shared HTTP session for the URL shortener, see get_http_session
+_http_session = None
+
+def load_tweepy():
+    """
+    Imports tweepy on first use and returns it.
+    Runs that only post to Bluesky never import it.
+    """
+    global tweepy
+    if tweepy is None:
+        import tweepy
+    return tweepy
+
+def load_atproto_client():
+    """
+    Imports the atproto Client class on first use and returns it.
+    Runs that only post to X never import it.
+    """
+    global AtprotoClient
+    if AtprotoClient is None:
+        # Updated to work with atproto 0.0.61
+        from atproto import Client as AtprotoClient
+    return AtprotoClient
+
+def get_http_session():
+    """
+    Returns the shared HTTP session for the URL shortener, creating it on
+    first use, so repeated requests reuse pooled connections.
+    """
+    global _http_session
+    if _http_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        _http_session = requests.Session()
+        _http_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=1))
+        _http_session.headers.update({'User-Agent': 'social-tweet-poster'})
+    return _http_session
+
+# Patterns stripped from tweets before similarity checks
+_URL_RE = re.compile(r'https?://\S+')
+_HASH_RE = re.compile(r'#\w+')
+_TS_RE = re.compile(r'\[\d{2}:\d{2}:\d{2}\]')
+
+# Domain and path of a URL matched by _URL_RE
+_URL_PARTS_RE = re.compile(r'https?://([^/?#]*)([^?#]*)')
+
+def load_json_file(path):
+    """
+    Loads a JSON file such as a posted tweet history file.
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_json_file(path, data):
+    """
+    Saves data to a JSON file in compact form.
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+
+def normalize_text(text):
+    """
+    Normalizes a tweet for similarity comparison:
+    lowercase, without URLs, hashtags and added timestamps.
+    """
+    # Extract just the tweet text if it has a timestamp
+    if '] ' in text:
+        text = text.split('] ', 1)[1]
+    # Remove URLs
+    text = _URL_RE.sub('', text)
+    # Remove hashtags
+    text = _HASH_RE.sub('', text)
+    # Remove timestamps and random numbers that might be added
+    text = _TS_RE.sub('', text)
+    # Convert to lowercase and strip whitespace
+    return text.lower().strip()
+
+def split_url(url):
+    """
+    Returns the (domain, path) of a URL matched by _URL_RE.
+    These are the same netloc and path urlparse gives, from a single regex match.
+    """
+    domain, path = _URL_PARTS_RE.match(url).groups()
+    # urlparse leaves ;params on the last path segment out of the path
+    if ';' in path:
+        cut = path.find(';', path.rfind('/'))
+        if cut >= 0:
+            path = path[:cut]
+    return domain, path
+
+# A posted tweet with the normalized forms used for similarity checks
+NormalizedTweet = namedtuple('NormalizedTweet', ['text', 'normalized', 'beginning_words', 'beginning', 'word_set'])
+
+def make_normalized_tweet(text):
+    """
+    Normalizes a tweet once and splits out everything the similarity
+    checks need: the first 5 words, their joined phrase and the word set.
+    """
+    normalized = normalize_text(text)
+    words = normalized.split()
+    beginning_words = words[:5]
+    return NormalizedTweet(text, normalized, beginning_words, ' '.join(beginning_words), frozenset(words))
+
+class RecentTweets:
+    """
+    Previously posted tweets used for duplicate detection.
+    
+    Each tweet is normalized once when it is added, so the duplicate checks
+    for every candidate tweet reuse the same normalized text, beginning
+    phrase and word set. Tweets too short for similarity detection are left
+    out of the normalized entries.
+    
+    Every posted URL is also indexed by its (domain, path), so checking a new
+    tweet for a reused link is a few dict lookups instead of a scan of
+    every URL in the archive.
+    
+    Tweets are kept oldest first, so tweets posted during the run are
+    appended as the newest ones.
+    """
+    def __init__(self, tweets=None):
+        self.tweets = []
+        self.entries = []
+        self.url_index = {}
+        for tweet in tweets or []:
+            self.append(tweet)
+    
+    def append(self, tweet):
+        self.tweets.append(tweet)
+        for url in _URL_RE.findall(tweet):
+            self.url_index.setdefault(split_url(url), url)
+        entry = make_normalized_tweet(tweet)
+        # Very short tweets are skipped for similarity detection
+        if len(entry.normalized) >= 20:
+            self.entries.append(entry)
+    
+    def __iter__(self):
+        return iter(self.tweets)
+    
+    def __len__(self):
+        return len(self.tweets)
+
+# Files found in the tweets directory, as returned by scan_tweet_dir
+TweetDirScan = namedtuple('TweetDirScan', ['tweet_files', 'history_files', 'archive_file'])
+
+def scan_tweet_dir(platform):
+    """
+    Scans the tweets directory once and sorts the files for a platform by kind.
+    
+    Returns a TweetDirScan with the sorted names of the tweet files, a dict of
+    date string -> path of the posted history files, and the path of the
+    archive file (None if it doesn't exist).
+    """
+    tweets_prefix = f"{platform}_tweets_"
+    history_prefix = f"{platform}_posted_"
+    archive_name = f"{platform}_posted_tweets_archive.txt"
+    tweet_files = []
+    history_files = {}
+    archive_file = None
+    with os.scandir(TWEETS_DIR) as entries:
+        for entry in entries:
+            name = entry.name
+            if name == archive_name:
+                archive_file = entry.path
+            elif name.startswith(history_prefix) and name.endswith(".json"):
+                history_files[name[len(history_prefix):-5]] = entry.path
+            elif name.startswith(tweets_prefix) and name.endswith(".txt"):
+                tweet_files.append(name)
+    tweet_files.sort()
+    return TweetDirScan(tweet_files, history_files, archive_file)
+
+def iter_tweets(path):
+    """
+    Yields the tweets of a '---' separated file one at a time, reading it
+    line by line instead of loading the whole file and splitting it.
+    
+    Tweets are split exactly like content.split('---'), including separators
+    that aren't on a line of their own, then stripped, and empty ones skipped.
+    """
+    pending = ''
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            pending += line
+            if '---' in pending:
+                *parts, pending = pending.split('---')
+                for part in parts:
+                    part = part.strip()
+                    if part:
+                        yield part
+    pending = pending.strip()
+    if pending:
+        yield pending
+
+# The tweets of a tweet file, and whether it had any '---' separator at all
+TweetFile = namedtuple('TweetFile', ['tweets', 'separated'])
+
+@lru_cache(maxsize=32)
+def read_tweet_file_snapshot(path, mtime_ns, size):
+    """
+    Returns a TweetFile for one version of a tweet file.
+    The modification time and size are only part of the cache key, so the
+    file is read again once it changes.
+    """
+    tweets = tuple(iter_tweets(path))
+    if len(tweets) > 1:
+        separated = True
+    else:
+        # A separator can't span lines, so look for one line by line
+        with open(path, 'r', encoding='utf-8') as f:
+            separated = any('---' in line for line in f)
+    return TweetFile(tweets, separated)
+
+def load_tweet_file(path):
+    """
+    Returns the TweetFile of a '---' separated tweet file, reusing the tweets
+    read last time while the file's modification time and size are unchanged,
+    so files loaded by several steps in a run are only read and split once.
+    """
+    stat = os.stat(path)
+    return read_tweet_file_snapshot(path, stat.st_mtime_ns, stat.st_size)
+
+def load_tweets(platform="x", scan=None):
     """
     Loads tweets from daily tweet file or falls back to platform-specific files.
     Returns a list of all tweets.
+    
+    Args:
+        platform: The platform (x, bluesky)
+        scan: Optional TweetDirScan to reuse instead of scanning the directory again
     """
     try:
         # First try to use the new shared daily file
@@ -91,17 +369,14 @@ def load_tweets(platform="x"):
         if os.path.exists(daily_tweet_file):
             # Load from the daily tweet file
             logger.info(f"Loading tweets from daily file: {daily_tweet_file}")
-            with open(daily_tweet_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             # Split by the separator (---) and filter out empty entries
-            daily_tweets = [tweet.strip() for tweet in content.split('---') if tweet.strip()]
+            daily_tweets = list(load_tweet_file(daily_tweet_file).tweets)
             logger.info(f"Loaded {len(daily_tweets)} tweets from daily file")
             return daily_tweets
         
         # Fallback to platform-specific files
         logger.info(f"Daily tweet file not found, falling back to platform-specific files")
-        tweet_files = [f for f in os.listdir(TWEETS_DIR) if f.startswith(f"{platform}_tweets_") and f.endswith(".txt")]
+        tweet_files = list((scan or scan_tweet_dir(platform)).tweet_files)
         
         if not tweet_files:
             logger.error(f"No tweet files found for platform: {platform}")
@@ -127,12 +402,8 @@ def load_tweets(platform="x"):
             file_path = os.path.join(TWEETS_DIR, file_name)
             logger.info(f"Loading tweets from {file_path}")
             
-            # Read the file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Split by the separator (---) and filter out empty entries
-            file_tweets = [tweet.strip() for tweet in content.split('---') if tweet.strip()]
+            # Read the file, split by the separator (---) and filter out empty entries
+            file_tweets = load_tweet_file(file_path).tweets
             
             # Add to all tweets
             all_tweets.extend(file_tweets)
@@ -145,7 +416,7 @@ def load_tweets(platform="x"):
         logger.error(f"Error loading tweets: {e}")
         return []
 
-def load_recently_posted_tweets(platform, days=7):
+def load_recently_posted_tweets(platform, days=7, scan=None):
     """
     Loads tweets that have been posted in the last specified days.
     This helps detect similarity with recently posted content.
@@ -155,34 +426,40 @@ def load_recently_posted_tweets(platform, days=7):
     2. Recent daily history files (contains tweets posted on specific days)
     3. Recent tweet files (contains all available tweets, posted or not)
     
-    Returns a comprehensive list of all tweets for duplicate detection.
+    Returns a RecentTweets collection of all tweets for duplicate detection.
+    
+    Args:
+        platform: The platform (x, bluesky)
+        days: Number of days of posted history to load
+        scan: Optional TweetDirScan to reuse instead of scanning the directory again
     """
     recent_tweets = []
+    # Every tweet text added from any source, for constant-time duplicate checks
+    seen_tweets = set()
     archived_count = 0
     daily_count = 0
     file_count = 0
     
     try:
+        # Scan the tweets directory once for every step below
+        scan = scan or scan_tweet_dir(platform)
+        
         # STEP 1: Load from the permanent archive file (most comprehensive source)
         archive_file = os.path.join(TWEETS_DIR, f"{platform}_posted_tweets_archive.txt")
-        if os.path.exists(archive_file):
+        if scan.archive_file is not None:
             try:
-                with open(archive_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Split by the separator and filter out empty entries
-                archived_tweets = [tweet.strip() for tweet in content.split('---') if tweet.strip()]
-                
-                # Extract the actual tweet text (remove the timestamp prefix if present)
-                for tweet in archived_tweets:
+                # Stream the archive entries, split by the separator with empty entries left out,
+                # and extract the actual tweet text (remove the timestamp prefix if present)
+                for tweet in iter_tweets(archive_file):
                     # If the tweet has our timestamp format, extract just the tweet text
                     if '] ' in tweet:
                         tweet_text = tweet.split('] ', 1)[1].strip()
                     else:
                         tweet_text = tweet.strip()
                     
-                    if tweet_text and tweet_text not in recent_tweets:
+                    if tweet_text and tweet_text not in seen_tweets:
                         recent_tweets.append(tweet_text)
+                        seen_tweets.add(tweet_text)
                         archived_count += 1
                 
                 logger.info(f"Loaded {archived_count} unique tweets from archive file")
@@ -202,35 +479,29 @@ def load_recently_posted_tweets(platform, days=7):
         # Look for posted tweet history files from the last N days
         fallback_tweets = []
         for date_str in date_strings:
-            history_file = os.path.join(TWEETS_DIR, f"{platform}_posted_{date_str}.json")
-            if os.path.exists(history_file):
+            history_file = scan.history_files.get(date_str)
+            if history_file is not None:
                 logger.info(f"Found posted tweet history for {date_str}")
                 
                 # Find corresponding tweet files from that day
-                matching_tweet_files = [f for f in os.listdir(TWEETS_DIR) 
-                                       if f.startswith(f"{platform}_tweets_") 
-                                       and date_str in f 
-                                       and f.endswith(".txt")]
+                matching_tweet_files = [f for f in scan.tweet_files if date_str in f]
                 
                 for tweet_file in matching_tweet_files:
                     file_path = os.path.join(TWEETS_DIR, tweet_file)
                     try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
                         # Split by the separator (---) and filter out empty entries
-                        file_tweets = [tweet.strip() for tweet in content.split('---') if tweet.strip()]
+                        file_tweets = load_tweet_file(file_path).tweets
                         
                         # Load the posted indices
-                        with open(history_file, 'r', encoding='utf-8') as f:
-                            posted_indices = json.load(f)
+                        posted_indices = load_json_file(history_file)
                         
                         # Add the tweets that were posted (if index is valid)
                         for idx in posted_indices:
                             if 0 <= idx < len(file_tweets):
                                 tweet_text = file_tweets[idx]
-                                if tweet_text and tweet_text not in recent_tweets and tweet_text not in fallback_tweets:
+                                if tweet_text and tweet_text not in seen_tweets:
                                     fallback_tweets.append(tweet_text)
+                                    seen_tweets.add(tweet_text)
                                     daily_count += 1
                     except Exception as e:
                         logger.error(f"Error reading tweets from {tweet_file}: {e}")
@@ -240,10 +511,8 @@ def load_recently_posted_tweets(platform, days=7):
         
         # STEP 3: As a final safety check, load recent tweet files (last 5) to ensure we don't miss anything
         try:
-            # Get all tweet files for this platform
-            all_tweet_files = sorted([f for f in os.listdir(TWEETS_DIR) 
-                                if f.startswith(f"{platform}_tweets_") 
-                                and f.endswith(".txt")], reverse=True)
+            # Get all tweet files for this platform, most recent first
+            all_tweet_files = scan.tweet_files[::-1]
             
             # Use only the 5 most recent files
             recent_files = all_tweet_files[:5]
@@ -253,19 +522,21 @@ def load_recently_posted_tweets(platform, days=7):
             for file in recent_files:
                 file_path = os.path.join(TWEETS_DIR, file)
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
+                    tweet_file = load_tweet_file(file_path)
                     
                     # Split by the separator and filter out empty entries
-                    if '---' in content:
-                        file_tweets = [tweet.strip() for tweet in content.split('---') if tweet.strip()]
+                    if tweet_file.separated:
+                        file_tweets = tweet_file.tweets
                     else:
-                        file_tweets = [line.strip() for line in content.splitlines() if line.strip()]
+                        # Without separators the file holds at most one stripped
+                        # entry, so split that into one tweet per line instead
+                        file_tweets = [line.strip() for line in ''.join(tweet_file.tweets).splitlines() if line.strip()]
                     
                     # Add unique tweets
                     for tweet in file_tweets:
-                        if tweet and tweet not in recent_tweets and tweet not in fallback_tweets and tweet not in additional_tweets:
+                        if tweet and tweet not in seen_tweets:
                             additional_tweets.append(tweet)
+                            seen_tweets.add(tweet)
                             file_count += 1
                 except Exception as e:
                     logger.error(f"Error reading tweets from {file}: {e}")
@@ -275,25 +546,45 @@ def load_recently_posted_tweets(platform, days=7):
         except Exception as e:
             logger.error(f"Error reading from recent tweet files: {e}")
         
-        # Combine all sources, ensuring uniqueness
-        all_tweets = recent_tweets + fallback_tweets
+        # Combine all sources, ensuring uniqueness, oldest first: the archive in
+        # the order it was written, then the daily history from the oldest day
+        all_tweets = recent_tweets + fallback_tweets[::-1]
         
         # Log detailed stats about what we loaded
         logger.info(f"Total unique tweets loaded for similarity checking: {len(all_tweets)}")
         logger.info(f"Sources: Archive={archived_count}, Daily files={daily_count}, Recent files={file_count}")
         
-        return all_tweets
+        return RecentTweets(all_tweets)
         
     except Exception as e:
         logger.error(f"Error loading recent tweets: {e}")
-        return []
+        return RecentTweets()
+
+def similarity_ratio(a, b, cutoff=0.0):
+    """
+    Returns the similarity ratio (0.0-1.0) of two strings, or 0.0 if it is
+    below cutoff.
+    
+    Uses rapidfuzz's C++ implementation when available, which can stop early
+    once the cutoff is out of reach. Otherwise uses difflib, where
+    real_quick_ratio() and quick_ratio() are cheap upper bounds on ratio(),
+    so the expensive matching-block computation is skipped for pairs that
+    cannot reach the cutoff anyway.
+    """
+    if fuzz is not None:
+        return fuzz.ratio(a, b, score_cutoff=max(cutoff, 0.0) * 100) / 100.0
+    matcher = difflib.SequenceMatcher(None, a, b)
+    if cutoff > 0 and (matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff):
+        return 0.0
+    return matcher.ratio()
 
 def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
     """
     Checks if a tweet is too similar to any existing tweet.
     Returns True if similar, False otherwise.
     
-    Uses difflib's SequenceMatcher to calculate text similarity.
+    Uses similarity_ratio (rapidfuzz, or difflib's SequenceMatcher) to
+    calculate text similarity.
     
     Enhanced to detect duplicates by:
     1. Using word-based similarity checking (better for detecting paraphrased content)
@@ -304,94 +595,55 @@ def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
     if not existing_tweets:
         return False
     
-    # Normalize tweet for comparison (lowercase, remove URLs and hashtags)
-    def normalize_text(text):
-        # Extract just the tweet text if it has a timestamp
-        if '] ' in text:
-            text = text.split('] ', 1)[1]
-        # Remove URLs
-        text = re.sub(r'https?://\S+', '', text)
-        # Remove hashtags
-        text = re.sub(r'#\w+', '', text)
-        # Remove timestamps and random numbers that might be added
-        text = re.sub(r'\[\d{2}:\d{2}:\d{2}\]', '', text)
-        # Convert to lowercase and strip whitespace
-        return text.lower().strip()
-    
-    # Check if tweet contains a URL - treat it differently
-    has_url = bool(re.search(r'https?://\S+', tweet))
+    if not isinstance(existing_tweets, RecentTweets):
+        existing_tweets = RecentTweets(existing_tweets)
     
     # Extract the URL(s) from the tweet
-    urls = re.findall(r'https?://\S+', tweet) if has_url else []
+    urls = _URL_RE.findall(tweet)
     
     # Handle tweets with URLs specially
-    if has_url:
+    if urls:
         # For tweets with URLs, we want to avoid posting the same link with different text
-        # Extract the URL domain for comparison
-        domains = []
-        for url in urls:
-            try:
-                from urllib.parse import urlparse
-                domain = urlparse(url).netloc
-                if domain:
-                    domains.append(domain)
-            except Exception as e:
-                logger.error(f"Error parsing URL {url}: {e}")
-        
-        # If we have domains, check for duplicates with the same domain
-        if domains:
-            # Look for existing tweets with the same domains
-            for existing in existing_tweets:
-                existing_urls = re.findall(r'https?://\S+', existing)
-                
-                for existing_url in existing_urls:
-                    try:
-                        from urllib.parse import urlparse
-                        existing_domain = urlparse(existing_url).netloc
-                        
-                        # If we found a matching domain
-                        if existing_domain in domains:
-                            # Now check if the path is similar too
-                            for url in urls:
-                                url_path = urlparse(url).path
-                                existing_path = urlparse(existing_url).path
-                                
-                                # If we're posting the same exact URL
-                                if url_path == existing_path:
-                                    logger.warning(f"Duplicate URL detected: {url}")
-                                    logger.warning(f"Existing: {existing_url}")
-                                    logger.warning(f"New: {url}")
-                                    return True
-                    except Exception as e:
-                        logger.error(f"Error comparing URLs: {e}")
+        # Extract the URL domain and path for comparison
+        url_parts = [(url,) + split_url(url) for url in urls]
+        domains = {domain for _, domain, _ in url_parts if domain}
+        
+        # If we have domains, check for existing URLs with the same domain and path
+        for domain in domains:
+            for url, _, url_path in url_parts:
+                existing_url = existing_tweets.url_index.get((domain, url_path))
+                # If we're posting the same exact URL
+                if existing_url is not None:
+                    logger.warning(f"Duplicate URL detected: {url}")
+                    logger.warning(f"Existing: {existing_url}")
+                    logger.warning(f"New: {url}")
+                    return True
     
-    normalized_tweet = normalize_text(tweet)
+    # Extract first few words (first 5) for checking similar beginnings
+    new_entry = make_normalized_tweet(tweet)
+    normalized_tweet = new_entry.normalized
+    beginning_words = new_entry.beginning_words
+    beginning_phrase = new_entry.beginning
+    tweet_words = new_entry.word_set
+    tweet_length = len(normalized_tweet)
     
     # Skip very short tweets for similarity detection
     if len(normalized_tweet) < 20:
         return False
     
-    # Extract first few words for checking similar beginnings
-    words = normalized_tweet.split()
-    beginning_words = words[:5]  # Use first 5 words
-    beginning_phrase = ' '.join(beginning_words)
-    
-    for existing in existing_tweets:
-        normalized_existing = normalize_text(existing)
-        
-        # Skip comparison with very short existing tweets
-        if len(normalized_existing) < 20:
-            continue
+    # Very short existing tweets were already left out of the entries
+    # Check the newest tweets first, since a duplicate is most likely of a recent post
+    for existing in reversed(existing_tweets.entries):
+        normalized_existing = existing.normalized
         
         # First check for similar beginnings (highly indicative of duplicate content)
-        existing_words = normalized_existing.split()
-        existing_beginning_words = existing_words[:5]
-        existing_beginning_phrase = ' '.join(existing_beginning_words)
+        existing_beginning_words = existing.beginning_words
+        existing_beginning_phrase = existing.beginning
         
         # If beginnings are very similar, apply a stricter similarity check
         beginning_similarity = 0
         if len(beginning_words) >= 3 and len(existing_beginning_words) >= 3:
-            beginning_similarity = difflib.SequenceMatcher(None, beginning_phrase, existing_beginning_phrase).ratio()
+            beginning_similarity = similarity_ratio(beginning_phrase, existing_beginning_phrase)
             
             # If first 5 words are extremely similar (> 0.9), highly likely to be duplicate content
             if beginning_similarity >= 0.9:
@@ -401,21 +653,16 @@ def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
                 return True
         
         # For full content comparison, do different comparisons
-        # 1. Full content similarity
-        full_similarity = difflib.SequenceMatcher(None, normalized_tweet, normalized_existing).ratio()
-        
-        # 2. Word-set similarity (Jaccard similarity - how many words are the same)
-        tweet_words = set(normalized_tweet.split())
-        existing_words = set(normalized_existing.split())
+        # 1. Word-set similarity (Jaccard similarity - how many words are the same)
+        # This is cheap, so do it before the full content comparison
+        existing_words = existing.word_set
         if tweet_words and existing_words:
-            intersection = tweet_words.intersection(existing_words)
-            union = tweet_words.union(existing_words)
-            word_similarity = len(intersection) / len(union) if union else 0
+            # The union size follows from the intersection, so the union set is never built
+            intersection_size = len(tweet_words & existing_words)
+            union_size = len(tweet_words) + len(existing_words) - intersection_size
+            word_similarity = intersection_size / union_size
         else:
             word_similarity = 0
-            
-        # Calculate combined score with more weight on beginning similarity
-        combined_score = (full_similarity * 0.5) + (beginning_similarity * 0.3) + (word_similarity * 0.2)
         
         # Adjust threshold based on how similar the beginnings are
         # More similar beginnings = lower threshold to detect duplicates
@@ -423,6 +670,22 @@ def is_similar_to_existing(tweet, existing_tweets, similarity_threshold=0.7):
         if beginning_similarity >= 0.7:
             # Lower the threshold the more similar the beginnings are
             adjusted_threshold = max(0.5, similarity_threshold - (beginning_similarity - 0.7))
+        
+        # 2. Full content similarity
+        # It only matters if it reaches 0.7 on its own or lifts the combined score
+        # up to the (adjusted or logging) threshold, so use that as the cutoff
+        needed_for_combined = (min(adjusted_threshold, 0.7) - (beginning_similarity * 0.3) - (word_similarity * 0.2)) / 0.5
+        full_cutoff = min(0.7, needed_for_combined)
+        # The ratio is at most 2*min(a, b)/(a + b), so tweets of very different
+        # lengths can be ruled out without calling similarity_ratio at all
+        existing_length = len(normalized_existing)
+        if 2.0 * min(tweet_length, existing_length) / (tweet_length + existing_length) < full_cutoff:
+            full_similarity = 0.0
+        else:
+            full_similarity = similarity_ratio(normalized_tweet, normalized_existing, full_cutoff)
+            
+        # Calculate combined score with more weight on beginning similarity
+        combined_score = (full_similarity * 0.5) + (beginning_similarity * 0.3) + (word_similarity * 0.2)
             
         # Determine if this is a duplicate based on our scores
         is_duplicate = False
@@ -470,17 +733,16 @@ def save_used_tweet_ids(platform, tweet_ids, tweets=None):
     
     try:
         # Load existing history if it exists
-        existing_ids = []
+        combined = set()
         if os.path.exists(history_file):
-            with open(history_file, 'r', encoding='utf-8') as f:
-                existing_ids = json.load(f)
+            combined.update(load_json_file(history_file))
                 
         # Add new IDs
-        combined_ids = list(set(existing_ids + tweet_ids))
+        combined.update(tweet_ids)
         
-        # Save back to file
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(combined_ids, f)
+        # Save back to file, sorted so the file only changes when the IDs do
+        combined_ids = sorted(combined)
+        save_json_file(history_file, combined_ids)
             
         logger.info(f"Saved {len(combined_ids)} used tweet IDs to {history_file}")
         
@@ -495,139 +757,102 @@ def save_used_tweet_ids(platform, tweet_ids, tweets=None):
             existing_archive_tweets = []
             try:
                 if os.path.exists(archive_file):
-                    with open(archive_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        existing_archive_tweets = [t.strip() for t in content.split('---') if t.strip()]
-                        logger.info(f"Loaded {len(existing_archive_tweets)} existing archived tweets")
+                    existing_archive_tweets = list(iter_tweets(archive_file))
+                    logger.info(f"Loaded {len(existing_archive_tweets)} existing archived tweets")
             except Exception as e:
                 logger.error(f"Error reading existing archive: {e}")
             
-            # Normalize tweets for comparison
-            def normalize_text(text):
-                # Extract just the tweet text if it has a timestamp
-                if '] ' in text:
-                    text = text.split('] ', 1)[1]
-                # Remove URLs
-                text = re.sub(r'https?://\S+', '', text)
-                # Remove hashtags
-                text = re.sub(r'#\w+', '', text)
-                # Remove timestamps and random numbers
-                text = re.sub(r'\[\d{2}:\d{2}:\d{2}\]', '', text)
-                # Convert to lowercase and strip whitespace
-                return text.lower().strip()
-                
-            # Normalize existing archive tweets
-            normalized_existing = [normalize_text(t) for t in existing_archive_tweets]
+            # Normalize existing archive tweets, skipping very short ones, and
+            # keep them sorted by length so candidates can be found by bisection
+            normalized_existing = sorted(
+                (n for n in map(normalize_text, existing_archive_tweets) if len(n) >= 20),
+                key=len
+            )
+            existing_lengths = [len(n) for n in normalized_existing]
+            # Exact repeats are found with a set lookup before any similarity checks
+            normalized_existing_set = set(normalized_existing)
             
             # Archive new tweets that aren't already in the archive
-            new_archived = 0
-            with open(archive_file, 'a', encoding='utf-8') as f:
-                for tweet in tweets:
-                    # Check if this tweet is already in the archive
-                    normalized_tweet = normalize_text(tweet)
-                    
-                    # Skip very short tweets for comparison
-                    if len(normalized_tweet) < 20:
-                        # Just add it without checking
-                        archive_entry = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tweet}\n---\n"
-                        f.write(archive_entry)
-                        new_archived += 1
-                        continue
-                    
-                    # Check against existing archived tweets
-                    is_duplicate = False
-                    for existing in normalized_existing:
-                        # Skip very short existing tweets
-                        if len(existing) < 20:
-                            continue
-                            
-                        # Calculate similarity using sequence matcher
-                        import difflib
-                        similarity = difflib.SequenceMatcher(None, normalized_tweet, existing).ratio()
+            # All entries from this call share one timestamp and are collected
+            # first, then appended to the archive in a single write
+            archived_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            new_entries = []
+            for tweet in tweets:
+                # Check if this tweet is already in the archive
+                normalized_tweet = normalize_text(tweet)
+                
+                # Skip very short tweets for comparison
+                if len(normalized_tweet) < 20:
+                    # Just add it without checking
+                    new_entries.append(f"[{archived_at}] {tweet}\n---\n")
+                    continue
+                
+                # Check against existing archived tweets
+                # The ratio is at most 2*min(a, b)/(a + b), so only tweets with
+                # 9*a <= 11*b and 9*b <= 11*a in length can reach 0.9
+                length = len(normalized_tweet)
+                lo = bisect.bisect_left(existing_lengths, -(-9 * length // 11))
+                hi = bisect.bisect_right(existing_lengths, 11 * length // 9)
+                duplicate_of = None
+                similarity = 0.0
+                if normalized_tweet in normalized_existing_set:
+                    duplicate_of, similarity = normalized_tweet, 1.0
+                else:
+                    for existing in normalized_existing[lo:hi]:
+                        # Calculate similarity, only the 0.9 duplicate cutoff matters here
+                        similarity = similarity_ratio(normalized_tweet, existing, 0.9)
                         
                         # If similarity is too high, consider it a duplicate
                         if similarity >= 0.9:
-                            logger.warning(f"Tweet already in archive (similarity: {similarity:.2f})")
-                            logger.warning(f"New: {normalized_tweet[:40]}...")
-                            logger.warning(f"Existing: {existing[:40]}...")
-                            is_duplicate = True
+                            duplicate_of = existing
                             break
-                    
-                    # If not a duplicate, add to archive
-                    if not is_duplicate:
-                        archive_entry = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tweet}\n---\n"
-                        f.write(archive_entry)
-                        new_archived += 1
-                        # Also add to our in-memory list for checking remaining tweets
-                        normalized_existing.append(normalized_tweet)
-                    else:
-                        logger.warning(f"Skipping duplicate tweet in archive")
-                    
+                
+                is_duplicate = duplicate_of is not None
+                if is_duplicate:
+                    logger.warning(f"Tweet already in archive (similarity: {similarity:.2f})")
+                    logger.warning(f"New: {normalized_tweet[:40]}...")
+                    logger.warning(f"Existing: {duplicate_of[:40]}...")
+                
+                # If not a duplicate, add to archive
+                if not is_duplicate:
+                    new_entries.append(f"[{archived_at}] {tweet}\n---\n")
+                    # Also add to our in-memory list for checking remaining tweets
+                    position = bisect.bisect_right(existing_lengths, length)
+                    existing_lengths.insert(position, length)
+                    normalized_existing.insert(position, normalized_tweet)
+                    normalized_existing_set.add(normalized_tweet)
+                else:
+                    logger.warning(f"Skipping duplicate tweet in archive")
+                
+            with open(archive_file, 'a', encoding='utf-8') as f:
+                f.writelines(new_entries)
+            new_archived = len(new_entries)
             logger.info(f"Archived {new_archived} new unique tweet texts to {archive_file}")
         
     except Exception as e:
         logger.error(f"Error saving used tweet IDs: {e}")
 
-def post_to_twitter(tweet_text):
+def get_twitter_client():
     """
-    Posts a tweet to Twitter/X using the v2 API, which works with the free tier.
-    Returns True if successful, False otherwise.
+    Returns the shared tweepy v2 Client, creating it on first use.
     
-    The tweet text will have its URLs shortened automatically if URL shortening is enabled.
+    The credentials are verified with get_me() until that succeeds once,
+    so later posts in the same run don't spend an API call on it.
     """
-    # Shorten URLs in the tweet text to save characters
-    tweet_text = shorten_urls_in_text(tweet_text)
-    # Debug logging for environment variable content
-    logger.info("======== TWITTER API CREDENTIALS DIAGNOSTICS ========")
-    logger.info(f"OS Environment Variables:")
-    import os
-    env_vars = {k: v for k, v in os.environ.items() if k.startswith('X_')}
-    logger.info(f"Found {len(env_vars)} Twitter-related environment variables")
-    
-    # Log credential availability (securely)
-    logger.info(f"Twitter API credentials check:")
-    logger.info(f"  X_API_KEY: {'✅ Present' if X_API_KEY else '❌ Missing'}")
-    logger.info(f"  X_API_SECRET: {'✅ Present' if X_API_SECRET else '❌ Missing'}")
-    logger.info(f"  X_ACCESS_TOKEN: {'✅ Present' if X_ACCESS_TOKEN else '❌ Missing'}")
-    logger.info(f"  X_ACCESS_SECRET: {'✅ Present' if X_ACCESS_SECRET else '❌ Missing'}")
-    logger.info(f"  X_BEARER_TOKEN: {'✅ Present' if X_BEARER_TOKEN else '❌ Missing'}")
-    
-    if not all([X_API_KEY, X_API_SECRET, X_ACCESS_TOKEN, X_ACCESS_SECRET]):
-        logger.error("Missing Twitter API credentials. Skipping.")
-        return False
+    global _twitter_client, _twitter_client_verified
     
-    try:
-        # Log partial keys (safely) to verify correct credentials are being used
-        logger.info(f"Using API key ending in: ...{X_API_KEY[-4:] if len(X_API_KEY) > 4 else 'too short'}")
-        logger.info(f"Using access token ending in: ...{X_ACCESS_TOKEN[-4:] if len(X_ACCESS_TOKEN) > 4 else 'too short'}")
-        
-        # Check for non-ASCII characters that might cause issues
-        import unicodedata
-        for var_name, var_value in {
-            'X_API_KEY': X_API_KEY,
-            'X_API_SECRET': X_API_SECRET,
-            'X_ACCESS_TOKEN': X_ACCESS_TOKEN,
-            'X_ACCESS_SECRET': X_ACCESS_SECRET
-        }.items():
-            if var_value:
-                # Check for invisible characters
-                has_invisible = any(c.isspace() and c != ' ' for c in var_value)
-                has_non_ascii = any(ord(c) > 127 for c in var_value)
-                if has_invisible or has_non_ascii:
-                    logger.warning(f"{var_name} contains invisible or non-ASCII characters")
-                    logger.warning(f"Character breakdown: {[(c, ord(c)) for c in var_value]}")
-        
-        # First verify credentials to check if they're valid
-        logger.info("Verifying Twitter credentials...")
-        
-        # Authenticate with Twitter using v2 Client
-        client = tweepy.Client(
+    if _twitter_client is None:
+        _twitter_client = load_tweepy().Client(
             consumer_key=X_API_KEY,
             consumer_secret=X_API_SECRET,
             access_token=X_ACCESS_TOKEN,
             access_token_secret=X_ACCESS_SECRET
         )
-        
+    client = _twitter_client
+    
+    if not _twitter_client_verified:
+        # First verify credentials to check if they're valid
+        logger.info("Verifying Twitter credentials...")
         try:
             # Try to get the authenticated user to verify credentials
             logger.info("Attempting to verify credentials with get_me()...")
@@ -635,6 +860,7 @@ def post_to_twitter(tweet_text):
             if me and hasattr(me, 'data') and me.data:
                 username = me.data.username
                 logger.info(f"✅ Successfully authenticated as @{username}")
+                _twitter_client_verified = True
             else:
                 logger.warning("⚠️ Authentication response format unexpected")
                 logger.warning(f"Response type: {type(me)}")
@@ -653,6 +879,47 @@ def post_to_twitter(tweet_text):
                 logger.error(f"User lookup also failed: {lookup_e}")
             
             # Continue anyway to try posting
+    
+    return client
+
+def post_to_twitter(tweet_text):
+    """
+    Posts a tweet to Twitter/X using the v2 API, which works with the free tier.
+    Returns True if successful, False otherwise.
+    
+    The tweet text will have its URLs shortened automatically if URL shortening is enabled.
+    """
+    # Shorten URLs in the tweet text to save characters
+    tweet_text = shorten_urls_in_text(tweet_text)
+    # Credential diagnostics are only gathered when debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("======== TWITTER API CREDENTIALS DIAGNOSTICS ========")
+        env_var_count = sum(1 for k in os.environ if k.startswith('X_'))
+        logger.debug(f"Found {env_var_count} Twitter-related environment variables")
+        
+        # Log credential availability (securely)
+        logger.debug(f"Twitter API credentials check:")
+        logger.debug(f"  X_API_KEY: {'✅ Present' if X_API_KEY else '❌ Missing'}")
+        logger.debug(f"  X_API_SECRET: {'✅ Present' if X_API_SECRET else '❌ Missing'}")
+        logger.debug(f"  X_ACCESS_TOKEN: {'✅ Present' if X_ACCESS_TOKEN else '❌ Missing'}")
+        logger.debug(f"  X_ACCESS_SECRET: {'✅ Present' if X_ACCESS_SECRET else '❌ Missing'}")
+        logger.debug(f"  X_BEARER_TOKEN: {'✅ Present' if X_BEARER_TOKEN else '❌ Missing'}")
+    
+    if not all([X_API_KEY, X_API_SECRET, X_ACCESS_TOKEN, X_ACCESS_SECRET]):
+        logger.error("Missing Twitter API credentials. Skipping.")
+        return False
+    
+    # The error handlers below need tweepy's exception classes
+    load_tweepy()
+    
+    try:
+        if logger.isEnabledFor(logging.DEBUG):
+            # Log partial keys (safely) to verify correct credentials are being used
+            logger.debug(f"Using API key ending in: ...{X_API_KEY[-4:] if len(X_API_KEY) > 4 else 'too short'}")
+            logger.debug(f"Using access token ending in: ...{X_ACCESS_TOKEN[-4:] if len(X_ACCESS_TOKEN) > 4 else 'too short'}")
+        
+        # Authenticate with Twitter using the shared v2 Client
+        client = get_twitter_client()
         
         # Ensure tweet is within Twitter's character limit (280)
         TWITTER_CHAR_LIMIT = 280
@@ -660,9 +927,7 @@ def post_to_twitter(tweet_text):
             logger.warning(f"Tweet exceeds Twitter's 280 character limit ({len(tweet_text)} chars). Truncating.")
             
             # Find URLs in the tweet text
-            import re
-            url_pattern = r'https?://\S+'
-            urls = re.findall(url_pattern, tweet_text)
+            urls = _URL_RE.findall(tweet_text)
             
             # If we have URLs, preserve the first one
             if urls and len(urls[0]) < TWITTER_CHAR_LIMIT - 5:
@@ -751,6 +1016,22 @@ def post_to_twitter(tweet_text):
         logger.error(f"Traceback: {traceback.format_exc()}")
         return False
 
+def get_bluesky_client():
+    """
+    Returns the shared Bluesky client, logging in on first use.
+    
+    The session is kept for the rest of the run, so later posts don't log
+    in again. If the login fails the exception is raised and the next call
+    tries again.
+    """
+    global _bluesky_client
+    
+    if _bluesky_client is None:
+        client = load_atproto_client()()
+        client.login(BLUESKY_USERNAME, BLUESKY_PASSWORD)
+        _bluesky_client = client
+    return _bluesky_client
+
 def post_to_bluesky(tweet_text):
     """
     Posts a tweet to Bluesky with proper link detection for clickable URLs.
@@ -758,6 +1039,8 @@ def post_to_bluesky(tweet_text):
     
     The tweet text will have its URLs shortened automatically if URL shortening is enabled.
     """
+    global _bluesky_client
+    
     # Shorten URLs in the tweet text to save characters
     tweet_text = shorten_urls_in_text(tweet_text)
     if not all([BLUESKY_USERNAME, BLUESKY_PASSWORD]):
@@ -765,13 +1048,11 @@ def post_to_bluesky(tweet_text):
         return False
     
     try:
-        # Authenticate with Bluesky using the newer API style
-        client = AtprotoClient()
-        client.login(BLUESKY_USERNAME, BLUESKY_PASSWORD)
+        # Authenticate with Bluesky using the shared, logged-in client
+        client = get_bluesky_client()
         
         # Find URLs in the tweet text
-        url_pattern = r'https?://\S+'
-        urls = re.findall(url_pattern, tweet_text)
+        urls = _URL_RE.findall(tweet_text)
         
         # Enforce Bluesky character limit (300 graphemes)
         # We'll use a much lower limit to be safe (250 characters)
@@ -821,7 +1102,7 @@ def post_to_bluesky(tweet_text):
             logger.info(f"Truncated tweet for Bluesky: {tweet_text}")
             
             # Refresh URLs after truncation
-            urls = re.findall(url_pattern, tweet_text)
+            urls = _URL_RE.findall(tweet_text)
         
         # Current time in RFC-3339 format
         current_time = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
@@ -890,6 +1171,8 @@ def post_to_bluesky(tweet_text):
     except Exception as e:
         logger.error(f"Error posting to Bluesky: {e}")
         logger.error(f"Error type: {type(e).__name__}")
+        # Log in again on the next post in case the session is no longer valid
+        _bluesky_client = None
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         return False
@@ -905,15 +1188,13 @@ def get_used_tweet_indices(platform):
     used_indices = []
     if os.path.exists(history_file):
         try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                used_indices = json.load(f)
+            used_indices = load_json_file(history_file)
                 
             # If we have used more than 50 tweets today, it's likely an error - reset the counter
             # This prevents the system from getting stuck in a state where it thinks all tweets are used
             if len(used_indices) > 50:
                 logger.warning(f"Found {len(used_indices)} used indices, which seems excessive. Resetting to empty.")
-                with open(history_file, 'w', encoding='utf-8') as f:
-                    json.dump([], f)
+                save_json_file(history_file, [])
                 return []
                 
         except Exception as e:
@@ -946,7 +1227,7 @@ def shorten_url(long_url):
         
         # Try using TinyURL's simple API
         tinyurl_api = f"https://tinyurl.com/api-create.php?url={encoded_url}"
-        response = requests.get(tinyurl_api, timeout=10)
+        response = get_http_session().get(tinyurl_api, timeout=10)
         
         if response.status_code == 200 and response.text and response.text.startswith('https://'):
             short_url = response.text.strip()
@@ -954,7 +1235,7 @@ def shorten_url(long_url):
             
             # Verify the shortened URL by testing the redirect
             try:
-                verify_response = requests.head(short_url, timeout=5, allow_redirects=False)
+                verify_response = get_http_session().head(short_url, timeout=5, allow_redirects=False)
                 if verify_response.status_code in (301, 302) and 'location' in verify_response.headers:
                     redirect_url = verify_response.headers['location']
                     logger.info(f"Verified redirect: {short_url} → {redirect_url}")
@@ -989,8 +1270,7 @@ def shorten_urls_in_text(text):
         
     try:
         # Find URLs in the text
-        url_pattern = r'https?://\S+'
-        urls = re.findall(url_pattern, text)
+        urls = _URL_RE.findall(text)
         
         if not urls:
             return text
@@ -1049,11 +1329,11 @@ def main(platform=None, count=1, similarity_threshold=0.7, force=False):
             logger.warning("Continuing without metrics tracking")
     # Print environment info for debugging
     import sys
-    import tweepy
     
     logger.info("======== ENVIRONMENT DIAGNOSTICS ========")
     logger.info(f"🔍 Python version: {sys.version}")
-    logger.info(f"🔍 Tweepy version: {tweepy.__version__}")
+    if platform in (None, "x"):
+        logger.info(f"🔍 Tweepy version: {load_tweepy().__version__}")
     logger.info(f"🔍 Current working directory: {os.getcwd()}")
     logger.info(f"🔍 Script directory: {os.path.dirname(os.path.abspath(__file__))}")
     logger.info(f"🔍 Platform(s) to post to: {platform if platform else 'both x and bluesky'}")
@@ -1091,9 +1371,11 @@ def main(platform=None, count=1, similarity_threshold=0.7, force=False):
             logger.info(f"Creating empty archive file for {p} at {archive_file}")
             try:
                 with open(archive_file, 'w', encoding='utf-8') as f:
-                    f.write("# Archive of all posted tweets for similarity detection\n")
-                    f.write("# Format: [timestamp] tweet text\n")
-                    f.write("# Separator: ---\n\n")
+                    f.writelines([
+                        "# Archive of all posted tweets for similarity detection\n",
+                        "# Format: [timestamp] tweet text\n",
+                        "# Separator: ---\n\n",
+                    ])
             except Exception as e:
                 logger.error(f"Failed to create archive file {archive_file}: {e}")
     
@@ -1101,8 +1383,11 @@ def main(platform=None, count=1, similarity_threshold=0.7, force=False):
     for p in platforms:
         logger.info(f"\n==== Processing platform: {p} ====")
         
+        # Scan the tweets directory once for both loaders below
+        scan = scan_tweet_dir(p)
+        
         # Load tweets for the platform
-        tweets = load_tweets(p)
+        tweets = load_tweets(p, scan)
         if not tweets:
             logger.warning(f"No tweets available for {p}. Skipping.")
             platform_results[p] = {"status": "skipped", "reason": "no_tweets_available"}
@@ -1117,7 +1402,7 @@ def main(platform=None, count=1, similarity_threshold=0.7, force=False):
         
         # Load ALL previously posted tweets for thorough similarity checking
         # This is crucial for preventing duplicates
-        recent_tweets = load_recently_posted_tweets(p, days=30)  # Increased from 7 to 30 days
+        recent_tweets = load_recently_posted_tweets(p, days=30, scan=scan)  # Increased from 7 to 30 days
         logger.info(f"Loaded {len(recent_tweets)} tweets for similarity checking")
         
         # Check if we need to reset the used indices - if most tweets are marked as used
@@ -1127,8 +1412,7 @@ def main(platform=None, count=1, similarity_threshold=0.7, force=False):
             # Reset the history file
             timestamp = datetime.now().strftime("%Y%m%d")
             history_file = os.path.join(TWEETS_DIR, f"{p}_posted_{timestamp}.json")
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump([], f)
+            save_json_file(history_file, [])
         
         # Get available indices (not used today)
         available_indices = [i for i in range(len(tweets)) if i not in used_indices]
@@ -1203,8 +1487,8 @@ def main(platform=None, count=1, similarity_threshold=0.7, force=False):
                 
                 # Normalize for comparison
                 def normalize_text(text):
-                    text = re.sub(r'https?://\S+', '', text)
-                    text = re.sub(r'#\w+', '', text)
+                    text = _URL_RE.sub('', text)
+                    text = _HASH_RE.sub('', text)
                     return text.lower().strip()
                 
                 normalized_tweet = normalize_text(tweet)